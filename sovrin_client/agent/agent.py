@@ -1,4 +1,5 @@
 import asyncio
+from collections import deque
 from typing import Dict
 from typing import Tuple
 
@@ -31,6 +32,12 @@ logger.setLevel(agentLoggingLevel)
 
 @decClassMethods(strict_types())
 class Agent(Motor, AgentNet):
+    # Seconds to wait for a remote to connect before dropping the messages
+    # queued for it
+    DefaultConnectTimeout = 60
+    # Max number of messages queued for a remote which is not connected yet
+    DefaultMaxQueuedPerRemote = 100
+
     def __init__(self,
                  name: str,
                  basedirpath: str,
@@ -47,7 +54,8 @@ class Agent(Motor, AgentNet):
                           name=self._name.replace(" ", ""),
                           port=port,
                           basedirpath=basedirpath,
-                          msgHandler=self.handleEndpointMessage)
+                          msgHandler=self.handleEndpointMessage,
+                          loop=self.loop)
 
         # Client used to connect to Sovrin and forward on owner's txns
         self._client = client  # type: Client
@@ -55,6 +63,14 @@ class Agent(Motor, AgentNet):
         # known identifiers of this agent's owner
         self.ownerIdentifiers = {}  # type: Dict[Identifier, Identity]
 
+        config = getConfig()
+        self.connectTimeout = getattr(config, 'AgentConnectTimeout',
+                                      self.DefaultConnectTimeout)
+        self.maxQueuedPerRemote = getattr(config, 'AgentMaxQueuedPerRemote',
+                                          self.DefaultMaxQueuedPerRemote)
+        # messages waiting for their remote to connect, by remote name
+        self._outboxes = {}  # type: Dict[str, deque]
+
     @property
     def client(self):
         return self._client
@@ -135,8 +151,19 @@ class Agent(Motor, AgentNet):
             if clbk:
                 clbk(*args)
         else:
-            self.loop.call_later(.2, self.ensureConnectedToDest,
-                                 destHa, clbk, *args)
+            asyncio.ensure_future(self._callWhenConnected(destHa, clbk, *args),
+                                  loop=self.loop)
+
+    async def _callWhenConnected(self, destHa, clbk, *args):
+        try:
+            await asyncio.wait_for(self.endpoint.waitForConnection(ha=destHa),
+                                   self.connectTimeout)
+        except asyncio.TimeoutError:
+            logger.warning("{} could not connect to {} in {} seconds".
+                           format(self, destHa, self.connectTimeout))
+            return
+        if clbk:
+            clbk(*args)
 
     def sendMessage(self, msg, name: str = None, ha: Tuple = None):
         try:
@@ -145,18 +172,48 @@ class Agent(Motor, AgentNet):
             fault(ex, "Do not know {} {}".format(name, ha))
             return
 
-        def _send(msg, remote):
-            self.endpoint.transmit(msg, remote.uid)
-            logger.debug("Message sent (to -> {}): {}".format(remote.ha, msg))
-
         # TODO: if we call following isConnectedTo method by ha,
         # there was a case it found more than one remote, so for now,
         # I have changed it to call by remote name (which I am not sure
         # fixes the issue), need to come back to this.
-        if not self.endpoint.isConnectedTo(name=remote.name):
-            self.ensureConnectedToDest(remote.ha, _send, msg, remote)
-        else:
-            _send(msg, remote)
+        outbox = self._outboxes.get(remote.name)
+        if outbox is None and self.endpoint.isConnectedTo(name=remote.name):
+            self._send(msg, remote)
+            return
+        if outbox is None:
+            outbox = self._outboxes[remote.name] = deque()
+            asyncio.ensure_future(self._flushWhenConnected(remote),
+                                  loop=self.loop)
+        if len(outbox) >= self.maxQueuedPerRemote:
+            logger.warning("{} dropping message to {} since {} messages are "
+                           "already waiting for it to connect: {}".
+                           format(self, remote.name, len(outbox), msg))
+            return
+        outbox.append(msg)
+
+    def _send(self, msg, remote):
+        self.endpoint.transmit(msg, remote.uid)
+        logger.debug("Message sent (to -> {}): {}".format(remote.ha, msg))
+
+    async def _flushWhenConnected(self, remote):
+        """
+        Send the messages queued for a remote once it is connected, or drop
+        them if it does not connect within `connectTimeout` seconds
+        """
+        try:
+            await asyncio.wait_for(
+                self.endpoint.waitForConnection(name=remote.name),
+                self.connectTimeout)
+        except asyncio.TimeoutError:
+            outbox = self._outboxes.pop(remote.name, ())
+            logger.warning("{} could not connect to {} in {} seconds, "
+                           "dropping {} messages".
+                           format(self, remote.name, self.connectTimeout,
+                                  len(outbox)))
+            return
+        outbox = self._outboxes.pop(remote.name, ())
+        for msg in outbox:
+            self._send(msg, remote)
 
     def connectToHa(self, ha):
         self.endpoint.connectTo(ha)
@@ -185,6 +242,7 @@ class WalletedAgent(Walleted, Agent, Caching):
                  attrRepo=None,
                  agentLogger=None):
         Agent.__init__(self, name, basedirpath, client, port, loop=loop)
+        Caching.__init__(self)
         self._wallet = wallet or Wallet(name)
         self._attrRepo = attrRepo or AttributeRepoInMemory()
         Walleted.__init__(self, agentLogger=(agentLogger or None))
@@ -199,6 +257,8 @@ class WalletedAgent(Walleted, Agent, Caching):
 
     @Agent.client.setter
     def client(self, client):
+        if self.client and self.client is not client:
+            self.client.unobserveWallet(self._wallet)
         Agent.client.fset(self, client)
         if self.client:
             self._initIssuerProverVerifier()
@@ -1,19 +1,70 @@
 from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any
 
+from plenum.common.log import getlogger
 from plenum.common.txn import NAME, VERSION, ORIGIN
 from plenum.common.types import f
 
 from anoncreds.protocol.issuer import Issuer
-from anoncreds.protocol.types import SchemaKey, ID
+from anoncreds.protocol.types import SchemaKey, ID, Claims
 from anoncreds.protocol.types import ClaimRequest
+from sovrin_client.agent.claim_issuance import issuerSnapshot, \
+    initClaimWorker, issueClaimInWorker
 from sovrin_client.agent.constants import EVENT_NOTIFY_MSG
 from sovrin_client.agent.msg_constants import CLAIM, CLAIM_REQ_FIELD, CLAIM_FIELD
+from sovrin_common.config_util import getConfig
+
+logger = getlogger()
 
 
 class AgentIssuer:
     def __init__(self, issuer: Issuer):
         self.issuer = issuer
+        # Number of worker processes claims are issued in, claims are issued
+        # on the event loop if 0
+        self.claimIssuanceWorkers = getattr(getConfig(),
+                                            'AgentClaimIssuanceWorkers', 0)
+        self._claimExecutor = None
+        # Public keys the issuer of the claim workers holds, by schema id
+        self._claimWorkerKeys = {}
+
+    async def issueClaim(self, schemaId: ID, claimReq: ClaimRequest) -> Claims:
+        """
+        Issue a claim, in a worker process if `claimIssuanceWorkers` is set.
+        Claims with a non-revocation part update the issuer's accumulator,
+        so they are always issued on the event loop.
+        """
+        if not self.claimIssuanceWorkers or claimReq.Ur is not None:
+            return await self.issuer.issueClaim(schemaId, claimReq)
+        pk = await self.issuer.wallet.getPublicKey(schemaId)
+        if self._claimWorkerKeys.get(schemaId) != pk:
+            try:
+                self._startClaimWorkers()
+            except Exception as ex:
+                logger.warning("{} cannot issue claim in a worker process, "
+                               "issuing it on the event loop: {}".
+                               format(self, ex))
+                return await self.issuer.issueClaim(schemaId, claimReq)
+            self._claimWorkerKeys[schemaId] = pk
+        attributes = self.issuer.attrRepo.getAttributes(schemaId.schemaKey,
+                                                        claimReq.userId)
+        claim = await self.loop.run_in_executor(
+            self._claimExecutor, issueClaimInWorker, schemaId,
+            claimReq.toStrDict(), attributes)
+        return Claims.fromStrDict(claim)
+
+    def _startClaimWorkers(self):
+        """
+        Start a new pool of claim workers holding the current key material
+        of the issuer, the previous pool finishes the claims it was given
+        """
+        snapshot = issuerSnapshot(self.issuer)
+        if self._claimExecutor is not None:
+            self._claimExecutor.shutdown(wait=False)
+        self._claimExecutor = ProcessPoolExecutor(
+            max_workers=self.claimIssuanceWorkers,
+            initializer=initClaimWorker, initargs=(snapshot,))
 
     async def processReqClaim(self, msg):
         body, (frm, ha) = msg
@@ -39,7 +90,7 @@ class AgentIssuer:
         self._addAtrribute(schemaKey=schemaKey, proverId=claimReq.userId,
                            link=link)
 
-        claim = await self.issuer.issueClaim(schemaId, claimReq)
+        claim = await self.issueClaim(schemaId, claimReq)
 
         claimDetails = {
             NAME: schema.name,
@@ -1,4 +1,5 @@
 from sovrin_client.agent.endpoint import Endpoint
+from sovrin_common.config_util import getConfig
 
 
 class AgentNet:
@@ -6,11 +7,16 @@ class AgentNet:
     Mixin for Agents to encapsulate the network interface to communicate with
     other agents.
     """
-    def __init__(self, name, port, basedirpath, msgHandler):
+    def __init__(self, name, port, basedirpath, msgHandler, loop=None):
         if port:
-            self.endpoint = Endpoint(port=port,
-                                     msgHandler=msgHandler,
-                                     name=name,
-                                     basedirpath=basedirpath)
+            config = getConfig()
+            self.endpoint = Endpoint(
+                port=port,
+                msgHandler=msgHandler,
+                name=name,
+                basedirpath=basedirpath,
+                batchWindow=getattr(config, 'AgentMsgBatchWindow', None),
+                maxBatchSize=getattr(config, 'AgentMsgMaxBatchSize', None),
+                loop=loop)
         else:
             self.endpoint = None
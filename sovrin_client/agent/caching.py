@@ -1,6 +1,20 @@
+import asyncio
+import json
+import time
+from collections import namedtuple
+from typing import Dict, Optional
+
 from plenum.common.exceptions import NotConnectedToAny
+from plenum.common.log import getlogger
+from plenum.common.txn import DATA, ROLE, VERKEY
+
+from sovrin_common.config_util import getConfig
 from sovrin_common.identity import Identity
 
+logger = getlogger()
+
+CachedIdentity = namedtuple('CachedIdentity', ['verkey', 'role', 'fetchedAt'])
+
 
 class Caching:
     """
@@ -10,6 +24,30 @@ class Caching:
     doesn't appear to be implemented in Python yet.
     """
 
+    # Seconds after which a cached identity is refreshed in the background
+    DefaultIdentityTtl = 300
+    # Seconds after which a cached identity is not used anymore
+    DefaultIdentityMaxAge = 3600
+    DefaultIdentityRefreshTimeout = 20
+    # Seconds between two background refreshes of the stale identities
+    DefaultIdentityRefreshInterval = 60
+
+    def __init__(self):
+        config = getConfig()
+        self.identityTtl = getattr(config, 'IdentityCacheTtl',
+                                   self.DefaultIdentityTtl)
+        self.identityMaxAge = getattr(config, 'IdentityCacheMaxAge',
+                                      self.DefaultIdentityMaxAge)
+        self.identityRefreshTimeout = getattr(
+            config, 'IdentityCacheRefreshTimeout',
+            self.DefaultIdentityRefreshTimeout)
+        self.identityRefreshInterval = getattr(
+            config, 'IdentityCacheRefreshInterval',
+            self.DefaultIdentityRefreshInterval)
+        self._identityCache = {}  # type: Dict[str, CachedIdentity]
+        self._refreshingIdentities = set()
+        self._nextStaleIdentitiesRefresh = 0
+
     def getClient(self):
         if self.client:
             return self.client
@@ -20,5 +58,91 @@ class Caching:
         identity = Identity(identifier=identifier)
         req = self.wallet.requestIdentity(identity,
                                           sender=self.wallet.defaultId)
-        self.getClient().submitReqs(req)
+        self.getClient().submitReqsDeduplicated(req)
         return req
+
+    def getCachedIdentity(self, identifier) -> Optional[CachedIdentity]:
+        """
+        Return the cached verkey and role of an identifier, or None if it is
+        not cached or too old to be used. Entries older than the TTL are
+        still returned but refreshed from Sovrin in the background.
+        Identifiers unknown to Sovrin are cached too, with no verkey.
+        """
+        entry = self._identityCache.get(identifier)
+        age = time.time() - entry.fetchedAt if entry else None
+        if entry is None or age >= self.identityTtl:
+            self._scheduleIdentityRefresh(identifier)
+        if entry is None or age >= self.identityMaxAge:
+            return None
+        return entry
+
+    def _scheduleIdentityRefresh(self, *identifiers):
+        identifiers = [i for i in identifiers
+                       if i not in self._refreshingIdentities]
+        if identifiers and self.client:
+            # Marked now rather than once the refresh runs, so that lookups
+            # until then do not schedule more refreshes
+            self._refreshingIdentities.update(identifiers)
+            self.loop.call_soon(asyncio.ensure_future,
+                                self.refreshIdentities(*identifiers))
+
+    async def refreshIdentity(self, identifier) -> Optional[CachedIdentity]:
+        self._refreshingIdentities.add(identifier)
+        try:
+            req = self.getIdentity(identifier)
+            reply, err = await self.getClient().awaitConsensus(
+                *req.key, timeout=self.identityRefreshTimeout)
+        except (NotConnectedToAny, asyncio.TimeoutError) as ex:
+            logger.debug("{} could not refresh identity {}: {}".
+                         format(self, identifier, ex))
+            return None
+        finally:
+            self._refreshingIdentities.discard(identifier)
+        if err or not reply:
+            return None
+        # No data means no NYM for the identifier, which is cached as well
+        data = json.loads(reply[DATA]) if reply.get(DATA) else {}
+        entry = CachedIdentity(data.get(VERKEY), data.get(ROLE), time.time())
+        self._identityCache[identifier] = entry
+        return entry
+
+    async def refreshIdentities(self, *identifiers):
+        """
+        Refresh several identities at once, the GET_NYM requests for all of
+        them are sent together
+        """
+        for identifier in identifiers:
+            self._refreshingIdentities.add(identifier)
+        return await asyncio.gather(*[self.refreshIdentity(i)
+                                      for i in identifiers])
+
+    def refreshStaleIdentities(self):
+        """
+        Schedule a refresh of every cached identity older than the TTL.
+        Identities too old to be used are evicted instead, they are fetched
+        again when next looked up.
+        """
+        now = time.time()
+        stale = []
+        for idr, entry in list(self._identityCache.items()):
+            age = now - entry.fetchedAt
+            if age >= self.identityMaxAge:
+                self.evictIdentity(idr)
+            elif age >= self.identityTtl:
+                stale.append(idr)
+        self._scheduleIdentityRefresh(*stale)
+
+    def refreshStaleIdentitiesIfDue(self):
+        """
+        Call `refreshStaleIdentities` if it was not called for
+        `identityRefreshInterval` seconds, meant to be called every prod
+        cycle
+        """
+        now = time.time()
+        if now >= self._nextStaleIdentitiesRefresh:
+            self._nextStaleIdentitiesRefresh = \
+                now + self.identityRefreshInterval
+            self.refreshStaleIdentities()
+
+    def evictIdentity(self, identifier):
+        self._identityCache.pop(identifier, None)
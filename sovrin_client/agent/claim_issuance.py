@@ -0,0 +1,92 @@
+import asyncio
+import copyreg
+import io
+import pickle
+from typing import Any, Dict
+
+from anoncreds.protocol.repo.attributes_repo import AttributeRepo, \
+    AttributeRepoInMemory
+from anoncreds.protocol.repo.public_repo import PublicRepo
+from anoncreds.protocol.types import ClaimRequest, ID
+from config.config import cmod
+from sovrin_client.anon_creds.sovrin_issuer import SovrinIssuer
+
+_PUBLIC_REPO = 'publicRepo'
+_ATTR_REPO = 'attrRepo'
+
+# Issuer of the claims of a worker process, set by `initClaimWorker`
+_workerIssuer = None  # type: SovrinIssuer
+
+
+def _reduceInteger(value):
+    return cmod.deserialize, (cmod.serialize(value),)
+
+
+class _IssuerPickler(pickle.Pickler):
+    """
+    Pickles an issuer without its public repo, which is bound to the agent's
+    client, and without its attribute repo, since the attributes of each
+    claim are passed along with its request
+    """
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.dispatch_table = copyreg.dispatch_table.copy()
+        self.dispatch_table[type(cmod.integer(0))] = _reduceInteger
+
+    def persistent_id(self, obj):
+        if isinstance(obj, PublicRepo):
+            return _PUBLIC_REPO
+        if isinstance(obj, AttributeRepo):
+            return _ATTR_REPO
+        return None
+
+
+class _IssuerUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        if pid == _PUBLIC_REPO:
+            return None
+        if pid == _ATTR_REPO:
+            return AttributeRepoInMemory()
+        raise pickle.UnpicklingError("Unknown persistent id {}".format(pid))
+
+
+def issuerSnapshot(issuer: SovrinIssuer) -> bytes:
+    """
+    Serialize the key material of `issuer` for `initClaimWorker`. The
+    schemas, keys and accumulators must already be in the issuer's wallet
+    since the snapshot cannot reach the public repo.
+    """
+    buf = io.BytesIO()
+    _IssuerPickler(buf).dump(issuer)
+    return buf.getvalue()
+
+
+def initClaimWorker(snapshot: bytes):
+    """
+    Initializer of claim issuance worker processes, restores the issuer
+    from a snapshot made by `issuerSnapshot` once per process
+    """
+    global _workerIssuer
+    _workerIssuer = _IssuerUnpickler(io.BytesIO(snapshot)).load()
+
+
+def issueClaimInWorker(schemaId: ID, claimReq: Dict[str, Any],
+                       attributes) -> Dict[str, Any]:
+    """
+    Issue a claim with the issuer of the worker process. Only the claim
+    request, the prover's attributes and the claim cross the process
+    boundary, the request and claim in their serialized form.
+    """
+    claimReq = ClaimRequest.fromStrDict(claimReq)
+    attrRepo = AttributeRepoInMemory()
+    attrRepo.addAttributes(schemaKey=schemaId.schemaKey,
+                           userId=claimReq.userId, attributes=attributes)
+    _workerIssuer.attrRepo = attrRepo
+    loop = asyncio.new_event_loop()
+    try:
+        claim = loop.run_until_complete(
+            _workerIssuer.issueClaim(schemaId, claimReq))
+    finally:
+        loop.close()
+    return claim.toStrDict()
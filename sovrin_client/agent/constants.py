@@ -10,4 +10,6 @@ EVENT_NAME = "eventName"
 EVENT_NOTIFY_MSG = "NOTIFY"
 EVENT_MSG_RECEIVED = "MSG_RECEIVED"
 EVENT_POST_ACCEPT_INVITE = "POST_ACCEPT_INVITE_EVENT"
-EVENT_NOT_CONNECTED_TO_ANY_ENV = "NOT_CONNECTED_TO_ANY_ENV"
\ No newline at end of file
+EVENT_NOT_CONNECTED_TO_ANY_ENV = "NOT_CONNECTED_TO_ANY_ENV"
+BATCH = "batch"
+BATCH_MSGS = "messages"
@@ -1,19 +1,36 @@
-from typing import Callable, Any, List
+import asyncio
+import time
+from typing import Callable, Any, List, Dict, Tuple
 
 from plenum.common.log import getlogger
 from plenum.common.raet import getHaFromLocalEstate
 from plenum.common.stacked import SimpleStack
+from plenum.common.txn import TYPE
 from plenum.common.types import HA
 from plenum.common.util import randomString
 from raet.raeting import AutoMode
 from raet.road.estating import RemoteEstate
 
+from sovrin_client.agent.constants import BATCH, BATCH_MSGS
+
 logger = getlogger()
 
 
 class Endpoint(SimpleStack):
+    """
+    If `batchWindow` is set, messages transmitted to the same remote within
+    that many seconds are sent together as one BATCH message, of at most
+    `maxBatchSize` messages, which the receiving endpoint unpacks. Both
+    sides need to support batches. Messages still queued when the endpoint
+    is stopped are sent before it stops.
+    """
+
+    DefaultMaxBatchSize = 50
+
     def __init__(self, port: int, msgHandler: Callable,
-                 name: str=None, basedirpath: str=None):
+                 name: str=None, basedirpath: str=None,
+                 batchWindow: float=None, maxBatchSize: int=None,
+                 loop=None):
         if name and basedirpath:
             ha = getHaFromLocalEstate(name, basedirpath)
             if ha and ha[1] != port:
@@ -32,6 +49,15 @@ class Endpoint(SimpleStack):
         super().__init__(stackParams, self.baseMsgHandler)
 
         self.msgHandler = msgHandler
+        self.loop = loop or asyncio.get_event_loop()
+        # futures waiting for a remote to be connected, by remote name and ha
+        self._connWaiters = {}  # type: Dict[Tuple, List[asyncio.Future]]
+        self.batchWindow = batchWindow
+        self.maxBatchSize = maxBatchSize or self.DefaultMaxBatchSize
+        # time the first message was queued, queued messages and the
+        # callable sending a message to the remote, by remote uid for
+        # `transmit` and by remote name for `transmitToClient`
+        self._outBatches = {}  # type: Dict[Any, Tuple[float, List, Callable]]
 
     def transmitToClient(self, msg: Any, remoteName: str):
         """
@@ -40,6 +66,13 @@ class Endpoint(SimpleStack):
         :param msg: a message
         :param remoteName: the name of the remote
         """
+        if self.batchWindow:
+            self._queueForBatch(('name', remoteName), msg,
+                                lambda m: self._sendToClient(m, remoteName))
+        else:
+            self._sendToClient(msg, remoteName)
+
+    def _sendToClient(self, msg: Any, remoteName: str):
         # At this time, nodes are not signing messages to clients, beyond what
         # happens inherently with RAET
         payload = self.prepForSending(msg)
@@ -57,7 +90,80 @@ class Endpoint(SimpleStack):
     # TODO: Rename method
     def baseMsgHandler(self, msg):
         logger.debug("Got {}".format(msg))
-        self.msgHandler(msg)
+        body, frm = msg
+        if isinstance(body, dict) and body.get(TYPE) == BATCH:
+            for m in body.get(BATCH_MSGS, []):
+                self.msgHandler((m, frm))
+        else:
+            self.msgHandler(msg)
+
+    def transmit(self, msg, uid, *args, **kwargs):
+        if not self.batchWindow:
+            return super().transmit(msg, uid, *args, **kwargs)
+        self._queueForBatch(('uid', uid), msg,
+                            lambda m: SimpleStack.transmit(self, m, uid))
+
+    def _queueForBatch(self, key, msg, send: Callable):
+        entry = self._outBatches.get(key)
+        if entry is None:
+            entry = self._outBatches[key] = (time.perf_counter(), [], send)
+        entry[1].append(msg)
+        if len(entry[1]) >= self.maxBatchSize:
+            self._flushBatch(key)
+
+    def flushBatches(self, force=False):
+        """
+        Send the messages queued for each remote for at least `batchWindow`
+        seconds, or all queued messages if `force` is set
+        """
+        now = time.perf_counter()
+        for key, (queuedAt, _, _) in list(self._outBatches.items()):
+            if force or now - queuedAt >= self.batchWindow:
+                self._flushBatch(key)
+
+    def _flushBatch(self, key):
+        _, msgs, send = self._outBatches.pop(key)
+        if len(msgs) == 1:
+            send(msgs[0])
+        else:
+            send({TYPE: BATCH, BATCH_MSGS: msgs})
+
+    def stop(self, *args, **kwargs):
+        if self._outBatches:
+            self.flushBatches(force=True)
+            self.serviceAllTx()
+        super().stop(*args, **kwargs)
+
+    async def service(self, limit=None) -> int:
+        count = await super().service(limit)
+        if self._connWaiters:
+            self._resolveConnWaiters()
+        if self._outBatches:
+            self.flushBatches()
+        return count
+
+    def waitForConnection(self, name: str = None, ha=None) -> asyncio.Future:
+        """
+        Return a future which is resolved once the remote with the given name
+        or ha is connected. Connections are checked once per `service` call
+        rather than by a timer per waiter.
+        """
+        fut = self.loop.create_future()
+        if self.isConnectedTo(name=name, ha=ha):
+            fut.set_result(True)
+        else:
+            self._connWaiters.setdefault((name, ha), []).append(fut)
+        return fut
+
+    def _resolveConnWaiters(self):
+        for key, futs in list(self._connWaiters.items()):
+            futs = [fut for fut in futs if not fut.done()]
+            if futs and not self.isConnectedTo(name=key[0], ha=key[1]):
+                self._connWaiters[key] = futs
+                continue
+            del self._connWaiters[key]
+            for fut in futs:
+                fut.set_result(True)
 
     def connectTo(self, ha):
         remote = self.findInRemotesByHA(ha)
@@ -0,0 +1,114 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Tuple
+
+from plenum.common.txn import TYPE
+from plenum.common.types import f
+
+from sovrin_client.agent.msg_constants import REF_REQUEST_ID
+
+
+def responseReqIds(body) -> Set:
+    """
+    Request ids a received message is a response for: its own request id
+    and the id of the request it refers to, like a PONG to its PING
+    """
+    return {body.get(f.REQ_ID.nm), body.get(REF_REQUEST_ID)} - {None}
+
+
+class RcvdMsgStore:
+    """
+    Bounded store of messages received by an agent, grouped by request id.
+
+    Entries are evicted once they are older than `maxAge` seconds or when
+    more than `maxSize` request ids are held, oldest first. Messages are
+    additionally indexed by (reqId, message type), for each request id they
+    are a response for, so responses of a particular type can be looked up
+    directly.
+    """
+
+    DefaultMaxAge = 600
+    DefaultMaxSize = 10000
+
+    def __init__(self, maxAge: float = None, maxSize: int = None,
+                 getTime=time.time):
+        self.maxAge = self.DefaultMaxAge if maxAge is None else maxAge
+        self.maxSize = self.DefaultMaxSize if maxSize is None else maxSize
+        self._getTime = getTime
+        # reqId -> (time first message was received, messages)
+        self._msgs = OrderedDict()  # type: Dict[Any, Tuple[float, List]]
+        self._byType = {}  # type: Dict[Tuple[Any, str], List]
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._msgs)
+
+    def __contains__(self, reqId):
+        return reqId in self._msgs
+
+    def add(self, reqId, msg):
+        self.evict()
+        entry = self._msgs.get(reqId)
+        if entry:
+            entry[1].append(msg)
+        else:
+            self._msgs[reqId] = (self._getTime(), [msg])
+        for key in self._typeKeys(reqId, msg):
+            self._byType.setdefault(key, []).append(msg)
+        while len(self._msgs) > self.maxSize:
+            self._evictOldest()
+
+    @staticmethod
+    def _typeKeys(reqId, msg):
+        body, _ = msg
+        typ = body.get(TYPE)
+        return [(i, typ) for i in responseReqIds(body) | {reqId}]
+
+    def get(self, reqId, default=None):
+        entry = self._msgs.get(reqId)
+        if entry:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return default
+
+    def getByType(self, reqId, typ) -> List:
+        msgs = self._byType.get((reqId, typ))
+        if msgs:
+            self.hits += 1
+            return msgs
+        self.misses += 1
+        return []
+
+    def evict(self):
+        """
+        Remove entries older than `maxAge`
+        """
+        expiry = self._getTime() - self.maxAge
+        while self._msgs:
+            reqId, (rcvdAt, _) = next(iter(self._msgs.items()))
+            if rcvdAt > expiry:
+                break
+            self._evictOldest()
+
+    def _evictOldest(self):
+        reqId, (_, msgs) = self._msgs.popitem(last=False)
+        for msg in msgs:
+            for key in self._typeKeys(reqId, msg):
+                indexed = self._byType.get(key)
+                if indexed and msg in indexed:
+                    indexed.remove(msg)
+                    if not indexed:
+                        del self._byType[key]
+        self.evictions += 1
+
+    @property
+    def stats(self):
+        return {
+            'size': len(self._msgs),
+            'evictions': self.evictions,
+            'hits': self.hits,
+            'misses': self.misses
+        }
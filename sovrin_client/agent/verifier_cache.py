@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Dict, Iterable, List, Tuple
+
+from plenum.common.verifier import DidVerifier
+
+
+class VerifierCache:
+    """
+    Caches the verifiers an agent builds to check message signatures, by
+    identifier and verkey, and the signatures it already verified, by
+    identifier, request id and digest of the signed message. Both are LRUs
+    bounded by `maxVerifiers` and `maxVerified` respectively.
+
+    A signature already verified over the same message identifies a message
+    already received, so it also tells duplicate deliveries apart.
+    """
+
+    DefaultMaxVerifiers = 1000
+    DefaultMaxVerified = 10000
+
+    def __init__(self, maxVerifiers: int = None, maxVerified: int = None):
+        self.maxVerifiers = maxVerifiers or self.DefaultMaxVerifiers
+        self.maxVerified = maxVerified or self.DefaultMaxVerified
+        self._verifiers = OrderedDict()  # type: Dict[Tuple[str, str], DidVerifier]
+        self._verified = OrderedDict()  # type: Dict[Tuple[str, int, str, bytes], None]
+        self.verifierHits = 0
+        self.verifierMisses = 0
+        self.duplicates = 0
+
+    def getVerifier(self, identifier, verkey) -> DidVerifier:
+        key = (identifier, verkey)
+        verifier = self._verifiers.get(key)
+        if verifier is not None:
+            self._verifiers.move_to_end(key)
+            self.verifierHits += 1
+            return verifier
+        self.verifierMisses += 1
+        verifier = DidVerifier(verkey, identifier=identifier)
+        self._verifiers[key] = verifier
+        if len(self._verifiers) > self.maxVerifiers:
+            self._verifiers.popitem(last=False)
+        return verifier
+
+    def isVerified(self, identifier, reqId, signature, ser: bytes) -> bool:
+        """
+        Whether `signature` was verified over the serialized message `ser`
+        """
+        key = (identifier, reqId, signature, sha256(ser).digest())
+        if key in self._verified:
+            self._verified.move_to_end(key)
+            return True
+        return False
+
+    def addVerified(self, identifier, reqId, signature, ser: bytes):
+        key = (identifier, reqId, signature, sha256(ser).digest())
+        self._verified[key] = None
+        self._verified.move_to_end(key)
+        if len(self._verified) > self.maxVerified:
+            self._verified.popitem(last=False)
+
+    @property
+    def stats(self):
+        return {
+            'verifiers': len(self._verifiers),
+            'verified': len(self._verified),
+            'verifierHits': self.verifierHits,
+            'verifierMisses': self.verifierMisses,
+            'duplicates': self.duplicates
+        }
+
+
+def verifyAll(checks: Iterable[Tuple[DidVerifier, bytes, bytes]]) -> List[bool]:
+    """
+    Check each (verifier, signature, serialized message), returning whether
+    each signature is valid
+    """
+    return [bool(verifier.verify(sig, ser)) for verifier, sig, ser in checks]
@@ -4,8 +4,9 @@ import inspect
 import json
 import time
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Union
+from typing import Callable, Dict, List, Tuple, Union
 
 from base58 import b58decode
 from plenum.common.log import getlogger
@@ -15,8 +16,7 @@ from plenum.common.txn import TYPE, DATA, NONCE, IDENTIFIER, NAME, VERSION, \
     TARGET_NYM, ATTRIBUTES, VERKEY, VERIFIABLE_ATTRIBUTES
 from plenum.common.types import f
 from plenum.common.util import getTimeBasedId, getCryptonym, \
-    isMaxCheckTimeExpired, convertTimeBasedReqIdToMillis
-from plenum.common.verifier import DidVerifier
+    convertTimeBasedReqIdToMillis
 
 from anoncreds.protocol.issuer import Issuer
 from anoncreds.protocol.prover import Prover
@@ -33,6 +33,9 @@ from sovrin_client.agent.msg_constants import ACCEPT_INVITE, REQUEST_CLAIM, \
     CLAIM_PROOF, \
     AVAIL_CLAIM_LIST, CLAIM, CLAIM_PROOF_STATUS, NEW_AVAILABLE_CLAIMS, \
     REF_REQUEST_ID
+from sovrin_client.agent.rcvd_msg_store import RcvdMsgStore, responseReqIds
+from sovrin_client.agent.verifier_cache import VerifierCache, verifyAll
+from sovrin_client.client.ledger_sync import LedgerSync
 from sovrin_client.client.wallet.attribute import Attribute, LedgerStore
 from sovrin_client.client.wallet.link import Link, constant, ClaimProofRequest
 from sovrin_client.client.wallet.wallet import Wallet
@@ -42,6 +45,7 @@ from sovrin_common.identity import Identity
 from sovrin_common.txn import ENDPOINT
 from sovrin_common.util import ensureReqCompleted
 from sovrin_common.config import agentLoggingLevel
+from sovrin_common.config_util import getConfig
 
 logger = getlogger()
 logger.setLevel(agentLoggingLevel)
@@ -55,6 +59,8 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
     case, the agent holds a wallet.
     """
 
+    DefaultVerifyThreads = 4
+
     def __init__(self,
                  issuer: Issuer = None,
                  prover: Prover = None,
@@ -65,10 +71,33 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
         AgentProver.__init__(self, prover)
         AgentVerifier.__init__(self, verifier)
 
+        self.ledgerSync = None  # type: LedgerSync
         # TODO Why are we syncing the client here?
         if self.client:
             self.syncClient()
-        self.rcvdMsgStore = {}  # type: Dict[reqId, [reqMsg]]
+        config = getConfig()
+        self.rcvdMsgStore = RcvdMsgStore(
+            maxAge=getattr(config, 'AgentRcvdMsgStoreMaxAge', None),
+            maxSize=getattr(config, 'AgentRcvdMsgStoreMaxSize', None))
+        self.verifierCache = VerifierCache(
+            maxVerifiers=getattr(config, 'AgentVerifierCacheSize', None),
+            maxVerified=getattr(config, 'AgentVerifiedSigCacheSize', None))
+        # Whether signatures of locked messages are verified in batches, once
+        # per prod cycle, on `verifyThreads` threads
+        self.batchVerify = getattr(config, 'AgentBatchVerifySignatures', False)
+        self.verifyThreads = getattr(config, 'AgentVerifyThreads',
+                                     self.DefaultVerifyThreads)
+        self._verifyExecutor = None
+        # locked messages waiting for verification, with their type, sender
+        # and the local identifier of their link
+        self._pendingVerification = []  # type: List[Tuple]
+        # Futures waiting for a response, along with whether the response
+        # must come from a known link
+        self._respWaiters = {}  # type: Dict[Tuple[int, str], List]
+        # Callbacks of accepted invitations by the identifier whose NYM
+        # is still to be signed and sent, and the task signing them
+        self._sponsoredCallbacks = {}  # type: Dict[str, Callable]
+        self._sponsoringTask = None
         self.msgHandlers = {
             ERROR: self._handleError,
             EVENT: self._eventHandler,
@@ -90,12 +119,16 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
         self.agentLogger = agentLogger or logger
 
     def syncClient(self):
-        obs = self._wallet.handleIncomingReply
-        if not self.client.hasObserver(obs):
-            self.client.registerObserver(obs)
-        self._wallet.pendSyncRequests()
+        self.client.observeWallet(self._wallet)
         prepared = self._wallet.preparePending()
         self.client.submitReqs(*prepared)
+        if self.ledgerSync is None or \
+                self.ledgerSync.wallet is not self._wallet:
+            self.ledgerSync = LedgerSync(self.client, self._wallet,
+                                         loop=self.loop)
+        else:
+            self.ledgerSync.setClient(self.client)
+        self.ledgerSync.start()
 
     @property
     def wallet(self) -> Wallet:
@@ -293,19 +326,29 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
             localIdr = link.localIdentifier
 
         if typ in self.lockedMsgs:
+            if self.isDuplicateMsg(body):
+                self.verifierCache.duplicates += 1
+                logger.debug("{} ignoring duplicate message {}".
+                             format(self, body))
+                return
+            if self.batchVerify:
+                # Verified with the other messages of this prod cycle
+                self._pendingVerification.append((msg, typ, frm, localIdr))
+                return
             try:
                 self.verifySignature(body)
             except SignatureRejected:
                 self.sendSigVerifResponseMsg("\nSignature rejected.",
                                              frm, typ, localIdr)
                 return
+        self._processVerifiedMsg(msg, typ, frm, localIdr)
+
+    def _processVerifiedMsg(self, msg, typ, frm, localIdr):
+        body, _ = msg
         reqId = body.get(f.REQ_ID.nm)
 
-        oldResps = self.rcvdMsgStore.get(reqId)
-        if oldResps:
-            oldResps.append(msg)
-        else:
-            self.rcvdMsgStore[reqId] = [msg]
+        self.rcvdMsgStore.add(reqId, msg)
+        self._resolveRespWaiters(msg)
 
         # TODO: Question: Should we sending an acknowledgement for every message?
         # We are sending, ACKs for "signature accepted" messages too
@@ -360,7 +403,7 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                 newAvailableClaims = self._getNewAvailableClaims(
                     li, rcvdAvailableClaims)
                 if newAvailableClaims:
-                    li.availableClaims.extend(newAvailableClaims)
+                    li.addAvailableClaims(newAvailableClaims)
                     claimNames = ", ".join(
                         [n for n, _, _ in newAvailableClaims])
                     self.notifyMsgListener(
@@ -397,7 +440,7 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                 newAvailableClaims = self._getNewAvailableClaims(
                     li, rcvdAvailableClaims)
                 if newAvailableClaims:
-                    li.availableClaims.extend(newAvailableClaims)
+                    li.addAvailableClaims(newAvailableClaims)
                     self.notifyMsgListener("    Available Claim(s): {}".
                         format(",".join(
                         [n for n, _, _ in newAvailableClaims])))
@@ -415,7 +458,12 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
             self.notifyMsgListener("No matching link found")
 
     def getVerkeyForLink(self, link):
-        # TODO: Get latest verkey for this link's remote identifier from Sovrin
+        # Prefer the latest verkey known to Sovrin for the remote identifier,
+        # so that key rotations are picked up once the cache is refreshed
+        if link.remoteIdentifier:
+            cached = self.getCachedIdentity(link.remoteIdentifier)
+            if cached and cached.verkey:
+                return cached.verkey
         if link.targetVerkey:
             return link.targetVerkey
         else:
@@ -429,14 +477,34 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
         else:
             raise LinkNotFound
 
-    def verifySignature(self, msg: Dict[str, str]):
+    @staticmethod
+    def _serializeSigned(msg: Dict[str, str]) -> bytes:
+        # What the signature of a message is over
+        return serializeMsg({k: v for k, v in msg.items() if k != f.SIG.nm})
+
+    def isDuplicateMsg(self, msg: Dict[str, str], ser: bytes = None):
+        """
+        Whether the same message, signature included, was already received
+        and verified. `ser` is the message as serialized for its signature.
+        """
+        return self.verifierCache.isVerified(
+            msg.get(IDENTIFIER), msg.get(f.REQ_ID.nm), msg.get(f.SIG.nm),
+            ser or self._serializeSigned(msg))
+
+    def _prepareSigVerification(self, msg: Dict[str, str]):
+        """
+        Return the verifier, decoded signature and serialized message needed
+        to check the signature of a message, or None if the signature was
+        already verified
+        """
         signature = msg.get(f.SIG.nm)
         identifier = msg.get(IDENTIFIER)
-        msgWithoutSig = {k: v for k, v in msg.items() if k != f.SIG.nm}
         # TODO This assumes the current key is the cryptonym. This is a BAD
         # ASSUMPTION!!! Sovrin needs to provide the current key.
-        ser = serializeMsg(msgWithoutSig)
-        signature = b58decode(signature.encode())
+        ser = self._serializeSigned(msg)
+        if signature and self.isDuplicateMsg(msg, ser):
+            return None
+        decodedSig = b58decode(signature.encode())
         typ = msg.get(TYPE)
         # TODO: Maybe keeping ACCEPT_INVITE open is a better option than keeping
         # an if condition here?
@@ -453,14 +521,94 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                 # Assuming CID for now.
                 verkey = link.targetVerkey
 
-        v = DidVerifier(verkey, identifier=identifier)
+        v = self.verifierCache.getVerifier(identifier, verkey)
+        return v, decodedSig, ser
+
+    def _sigVerified(self, msg: Dict[str, str], ser: bytes = None):
+        self.verifierCache.addVerified(msg.get(IDENTIFIER),
+                                       msg.get(f.REQ_ID.nm),
+                                       msg.get(f.SIG.nm),
+                                       ser or self._serializeSigned(msg))
+        if msg.get(TYPE) == ACCEPT_INVITE:
+            self.agentLogger.info('\nSignature accepted.')
+
+    def verifySignature(self, msg: Dict[str, str]):
+        prepared = self._prepareSigVerification(msg)
+        if prepared is None:
+            return True
+        v, signature, ser = prepared
         if not v.verify(signature, ser):
             raise SignatureRejected
         else:
-            if typ == ACCEPT_INVITE:
-                self.agentLogger.info('\nSignature accepted.')
+            self._sigVerified(msg, ser)
             return True
 
+    async def prod(self, limit) -> int:
+        c = await super().prod(limit)
+        if self._pendingVerification:
+            c += await self.verifyPendingMsgs()
+        self.refreshStaleIdentitiesIfDue()
+        return c
+
+    async def verifyPendingMsgs(self) -> int:
+        """
+        Verify the signatures of the locked messages received since the last
+        call together, split across the threads of `verifyExecutor`, and
+        process the messages whose signature is accepted
+        """
+        pending = self._pendingVerification
+        self._pendingVerification = []
+        toVerify = []
+        for item in pending:
+            body = item[0][0]
+            try:
+                prepared = self._prepareSigVerification(body)
+            except Exception as ex:
+                logger.debug("{} cannot verify signature of {}: {}".
+                             format(self, body, ex))
+                prepared = False
+            toVerify.append(prepared)
+        checks = [p for p in toVerify if p]
+        chunkSize = max(1, -(-len(checks) // self.verifyThreads))
+        chunks = [checks[i:i + chunkSize]
+                  for i in range(0, len(checks), chunkSize)]
+        results = await asyncio.gather(*[
+            self.loop.run_in_executor(self.verifyExecutor, verifyAll, chunk)
+            for chunk in chunks])
+        results = iter([r for chunkResults in results for r in chunkResults])
+
+        for (msg, typ, frm, localIdr), prepared in zip(pending, toVerify):
+            body = msg[0]
+            # `prepared` is None if the signature was verified since the
+            # message was received
+            accepted = next(results) if prepared else prepared is None
+            if not accepted:
+                self.sendSigVerifResponseMsg("\nSignature rejected.",
+                                             frm, typ, localIdr)
+                continue
+            ser = prepared[2] if prepared else None
+            if self.isDuplicateMsg(body, ser):
+                self.verifierCache.duplicates += 1
+                continue
+            self._sigVerified(body, ser)
+            self._processVerifiedMsg(msg, typ, frm, localIdr)
+        return len(pending)
+
+    @property
+    def verifyExecutor(self):
+        if self._verifyExecutor is None:
+            self._verifyExecutor = ThreadPoolExecutor(
+                max_workers=self.verifyThreads)
+        return self._verifyExecutor
+
+    def stop(self, *args, **kwargs):
+        super().stop(*args, **kwargs)
+        for executor in (self._verifyExecutor, self._claimExecutor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._verifyExecutor = None
+        self._claimExecutor = None
+
     def _getLinkByTarget(self, target) -> Link:
         return self.wallet.getLinkInvitationByTarget(target)
 
@@ -555,16 +703,13 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
             logger.debug(
                 "not added to the ledger, so add nym to the ledger "
                 "and then will send available claims")
-            reqs = self.wallet.preparePending()
-            # Assuming there was only one pending request
-            logger.debug("sending to sovrin {}".format(reqs[0]))
             # Specifically for bulldog POC, need to think through
             # how to provide separate logging for each agent
             # anyhow this class should be implemented by each agent
             # so we might not even need to add it as a separate logic
             self.agentLogger.info('Creating identifier [{}] in sovrin'
                                   .format(identifier))
-            self._sendToSovrinAndDo(reqs[0], clbk=sendClaimList)
+            self._sendSponsoredIdentity(identifier, clbk=sendClaimList)
 
             # TODO: If I have the below exception thrown, somehow the
             # error msg which is sent in verifyAndGetLink is not being received
@@ -572,6 +717,36 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
             # else:
             #     raise NotImplementedError
 
+    def _sendSponsoredIdentity(self, identifier, clbk=None):
+        self._sponsoredCallbacks[identifier] = clbk
+        if self._sponsoringTask is None:
+            self._sponsoringTask = asyncio.ensure_future(
+                self._sendSponsoredIdentities(), loop=self.loop)
+
+    async def _sendSponsoredIdentities(self):
+        """
+        Sign the pending requests, including the NYMs of all invitations
+        accepted meanwhile, as one batch off the event loop and send them
+        """
+        try:
+            while self._sponsoredCallbacks:
+                reqs = await self.wallet.preparePendingAsync(loop=self.loop)
+                if not reqs:
+                    logger.warning("no pending requests for identifiers {}"
+                                   .format(list(self._sponsoredCallbacks)))
+                    self._sponsoredCallbacks.clear()
+                    break
+                logger.debug("sending to sovrin {}".format(reqs))
+                self.client.submitReqs(*reqs)
+                for req in reqs:
+                    clbk = self._sponsoredCallbacks.pop(
+                        req.operation.get(TARGET_NYM), None)
+                    if clbk:
+                        ensureReqCompleted(self.loop, req.key, self.client,
+                                           clbk)
+        finally:
+            self._sponsoringTask = None
+
     def _sendToSovrinAndDo(self, req, clbk=None, *args):
         self.client.submitReqs(req)
         ensureReqCompleted(self.loop, req.key, self.client, clbk, *args)
@@ -682,7 +857,7 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                     )
                 else:
                     # otherwise append claim proof request to link
-                    link.claimProofRequests.append(
+                    link.addClaimProofRequest(
                         ClaimProofRequest(
                             icr[NAME], icr[VERSION], icr[ATTRIBUTES],
                             icr[VERIFIABLE_ATTRIBUTES]
@@ -725,11 +900,9 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                 raise RuntimeError(err)
             reqId = self._updateLinkWithLatestInfo(link, reply)
             if reqId:
-                self.loop.call_later(.2,
-                                     self.executeWhenResponseRcvd,
-                                     time.time(), 8000,
-                                     self.loop, reqId, PONG, True,
-                                     additionalCallback, reply, err)
+                self.executeWhenResponseRcvd(time.time(), 8000,
+                                             reqId, PONG, True,
+                                             additionalCallback, reply, err)
             else:
                 additionalCallback(reply, err)
 
@@ -766,7 +939,7 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                            dest=nym,
                            ledgerStore=LedgerStore.RAW)
         req = self.wallet.requestAttribute(attrib, sender=self.wallet.defaultId)
-        self.client.submitReqs(req)
+        self.client.submitReqsDeduplicated(req)
 
         if doneCallback:
             self.loop.call_later(.2,
@@ -776,35 +949,71 @@ class Walleted(AgentIssuer, AgentProver, AgentVerifier):
                                  self.client,
                                  self._handleSyncResp(link, doneCallback))
 
+    def _isMatchingResp(self, msg, checkIfLinkExists):
+        if not checkIfLinkExists:
+            return True
+        body, _ = msg
+        identifier = body.get(IDENTIFIER)
+        return self._getLinkByTarget(getCryptonym(identifier)) is not None
+
+    def _resolveRespWaiters(self, msg):
+        body, _ = msg
+        typ = body.get(TYPE)
+        for reqId in responseReqIds(body):
+            for fut, checkIfLinkExists in self._respWaiters.get((reqId, typ),
+                                                                 []):
+                if not fut.done() and \
+                        self._isMatchingResp(msg, checkIfLinkExists):
+                    fut.set_result(msg)
+
+    async def waitForResponse(self, reqId, respType, timeout,
+                              checkIfLinkExists=False):
+        """
+        Wait until a message of type `respType` is received for request
+        `reqId`, with that request id or referring to it. Returns immediately
+        if such a message was already received.
+
+        :param timeout: seconds to wait for
+        :param checkIfLinkExists: only accept responses coming from an
+        identifier this agent has a link with
+        :return: the received message
+        :raises asyncio.TimeoutError: if no response arrived in time
+        """
+        for msg in self.rcvdMsgStore.getByType(reqId, respType):
+            if self._isMatchingResp(msg, checkIfLinkExists):
+                return msg
+        key = (reqId, respType)
+        waiter = (self.loop.create_future(), checkIfLinkExists)
+        self._respWaiters.setdefault(key, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[0], timeout)
+        finally:
+            waiters = self._respWaiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._respWaiters.pop(key, None)
+
     def executeWhenResponseRcvd(self, startTime, maxCheckForMillis,
-                                loop, reqId, respType,
+                                reqId, respType,
                                 checkIfLinkExists, clbk, *args):
-
-        if isMaxCheckTimeExpired(startTime, maxCheckForMillis):
-            clbk(None, "No response received within specified time ({} mills). "
-                       "Retry the command and see if that works.\n".
-                 format(maxCheckForMillis))
-        else:
-            found = False
-            rcvdResponses = self.rcvdMsgStore.get(reqId)
-            if rcvdResponses:
-                for msg in rcvdResponses:
-                    body, frm = msg
-                    if body.get(TYPE) == respType:
-                        if checkIfLinkExists:
-                            identifier = body.get(IDENTIFIER)
-                            li = self._getLinkByTarget(getCryptonym(identifier))
-                            linkCheckOk = li is not None
-                        else:
-                            linkCheckOk = True
-
-                        if linkCheckOk:
-                            found = True
-                            break
-
-            if found:
-                clbk(*args)
+        """
+        Call `clbk` with `args` once a response of type `respType` is
+        received for request `reqId`, or already was, or with an error if
+        none is received within `maxCheckForMillis` of `startTime`
+        """
+        remainingMillis = maxCheckForMillis - (time.time() - startTime) * 1000
+
+        async def _waitAndExecute():
+            try:
+                await self.waitForResponse(reqId, respType,
+                                           max(remainingMillis, 0) / 1000,
+                                           checkIfLinkExists)
+            except asyncio.TimeoutError:
+                clbk(None, "No response received within specified time ({} "
+                           "mills). Retry the command and see if that works.\n".
+                     format(maxCheckForMillis))
             else:
-                loop.call_later(.2, self.executeWhenResponseRcvd,
-                                startTime, maxCheckForMillis, loop,
-                                reqId, respType, checkIfLinkExists, clbk, *args)
+                clbk(*args)
+
+        asyncio.ensure_future(_waitAndExecute(), loop=self.loop)
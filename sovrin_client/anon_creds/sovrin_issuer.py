@@ -13,3 +13,14 @@ class SovrinIssuer(Issuer):
                                                     wallet=wallet)
         issuerWallet = IssuerWalletInMemory(wallet.name, publicRepo)
         super().__init__(issuerWallet, attrRepo)
+
+    @property
+    def attrRepo(self) -> AttributeRepo:
+        """
+        Repo the attributes of issued claims are read from
+        """
+        return self._attrRepo
+
+    @attrRepo.setter
+    def attrRepo(self, attrRepo: AttributeRepo):
+        self._attrRepo = attrRepo
@@ -1,8 +1,8 @@
+import asyncio
 import json
+from typing import Dict
 
 from ledger.util import F
-from plenum.common.eventually import eventually
-from plenum.common.exceptions import NoConsensusYet
 from plenum.common.log import getlogger
 from plenum.common.txn import TARGET_NYM, TXN_TYPE, DATA, NAME, VERSION, TYPE, \
     ORIGIN
@@ -13,16 +13,11 @@ from anoncreds.protocol.types import Schema, ID, PublicKey, \
     Accumulator, TailsType, TimestampType
 from sovrin_common.txn import GET_SCHEMA, SCHEMA, ATTR_NAMES, \
     GET_ISSUER_KEY, REF, ISSUER_KEY, PRIMARY, REVOCATION
+from sovrin_client.client.exception import OperationError
+from sovrin_client.persistence.public_data_cache import PublicDataCache
 from sovrin_common.types import Request
 
 
-def _ensureReqCompleted(reqKey, client, clbk):
-    reply, err = client.replyIfConsensus(*reqKey)
-    if reply is None:
-        raise NoConsensusYet('not completed')
-    return clbk(reply, err)
-
-
 def _getData(result, error):
     data = json.loads(result.get(DATA).replace("\'", '"'))
     seqNo = None if not data else data.get(F.seqNo.name)
@@ -39,10 +34,46 @@ logger = getlogger()
 
 
 class SovrinPublicRepo(PublicRepo):
-    def __init__(self, client, wallet):
+    def __init__(self, client, wallet, cache: PublicDataCache = None):
         self.client = client
         self.wallet = wallet
         self.displayer = print
+        # Schemas and issuer keys never change once written to the ledger, so
+        # replies for them are cached
+        self.cache = cache or client.publicDataCache
+        # requests currently being sent, by cache key, so that concurrent
+        # fetches of the same data share one request
+        self._inFlight = {}  # type: Dict[str, asyncio.Future]
+
+    @staticmethod
+    def _schemaCacheKey(id: ID):
+        return json.dumps([SCHEMA, id.schemaKey.issuerId, id.schemaKey.name,
+                           id.schemaKey.version])
+
+    @staticmethod
+    def _issuerKeyCacheKey(id: ID):
+        return json.dumps([ISSUER_KEY, id.schemaKey.issuerId, id.schemaId])
+
+    async def _getCachedOrSend(self, cacheKey, op):
+        cached = self.cache.get(cacheKey)
+        if cached:
+            data, seqNo = cached
+            return data, seqNo
+        fut = self._inFlight.get(cacheKey)
+        if fut is None:
+            fut = asyncio.ensure_future(self._sendAndCache(cacheKey, op))
+            self._inFlight[cacheKey] = fut
+            fut.add_done_callback(
+                lambda _: self._inFlight.pop(cacheKey, None))
+        # Shielded so that one caller being cancelled does not cancel the
+        # request for the others
+        return await asyncio.shield(fut)
+
+    async def _sendAndCache(self, cacheKey, op):
+        data, seqNo = await self._sendGetReq(op)
+        if data:
+            self.cache.put(cacheKey, [data, seqNo])
+        return data, seqNo
 
     async def getSchema(self, id: ID) -> Schema:
         op = {
@@ -54,10 +85,14 @@ class SovrinPublicRepo(PublicRepo):
             }
         }
         try:
-            data, seqNo = await self._sendGetReq(op)
+            data, seqNo = await self._getCachedOrSend(
+                self._schemaCacheKey(id), op)
         except TimeoutError:
             logger.error('Operation timed out {}'.format(op))
             return None
+        except OperationError as ex:
+            logger.error('Operation {} rejected: {}'.format(op, ex.error))
+            return None
         return Schema(name=data[NAME],
                                version=data[VERSION],
                                schemaType=data[TYPE],
@@ -65,7 +100,7 @@ class SovrinPublicRepo(PublicRepo):
                                issuerId=data[ORIGIN],
                                seqId=seqNo)
 
-    async def getPublicKey(self, id: ID) -> PublicKey:
+    async def _getIssuerKeyData(self, id: ID):
         op = {
             TXN_TYPE: GET_ISSUER_KEY,
             REF: id.schemaId,
@@ -73,10 +108,16 @@ class SovrinPublicRepo(PublicRepo):
         }
 
         try:
-            data, seqNo = await self._sendGetReq(op)
+            return await self._getCachedOrSend(self._issuerKeyCacheKey(id), op)
         except TimeoutError:
             logger.error('Operation timed out {}'.format(op))
-            return None
+            return None, None
+        except OperationError as ex:
+            logger.error('Operation {} rejected: {}'.format(op, ex.error))
+            return None, None
+
+    async def getPublicKey(self, id: ID) -> PublicKey:
+        data, seqNo = await self._getIssuerKeyData(id)
 
         if not data:
             return None
@@ -86,17 +127,7 @@ class SovrinPublicRepo(PublicRepo):
         return pk
 
     async def getPublicKeyRevocation(self, id: ID) -> RevocationPublicKey:
-        op = {
-            TXN_TYPE: GET_ISSUER_KEY,
-            REF: id.schemaId,
-            ORIGIN: id.schemaKey.issuerId
-        }
-
-        try:
-            data, seqNo = await self._sendGetReq(op)
-        except TimeoutError:
-            logger.error('Operation timed out {}'.format(op))
-            return None
+        data, seqNo = await self._getIssuerKeyData(id)
 
         if not data:
             return None
@@ -133,6 +164,9 @@ class SovrinPublicRepo(PublicRepo):
         except TimeoutError:
             logger.error('Operation timed out {}'.format(op))
             return None
+        except OperationError as ex:
+            logger.error('Operation {} rejected: {}'.format(op, ex.error))
+            return None
 
         if not seqNo:
             return None
@@ -156,6 +190,9 @@ class SovrinPublicRepo(PublicRepo):
         except TimeoutError:
             logger.error('Operation timed out {}'.format(op))
             return None
+        except OperationError as ex:
+            logger.error('Operation {} rejected: {}'.format(op, ex.error))
+            return None
 
         if not seqNo:
             return None
@@ -180,11 +217,16 @@ class SovrinPublicRepo(PublicRepo):
     async def _sendReq(self, op, clbk):
         req = Request(identifier=self.wallet.defaultId, operation=op)
         req = self.wallet.prepReq(req)
-        self.client.submitReqs(req)
+        self.client.submitReqsDeduplicated(req)
         try:
-            resp = await eventually(_ensureReqCompleted,
-                                    req.key, self.client, clbk,
-                                    timeout=20, retryWait=0.5)
-        except NoConsensusYet:
+            reply, err = await self.client.awaitConsensus(*req.key,
+                                                          timeout=20)
+        except asyncio.TimeoutError:
             raise TimeoutError('Request timed out')
-        return resp
+        finally:
+            # The wallet may not observe the client, release the request here
+            # rather than leaving it to expire
+            self.wallet.releasePrepared(req.key)
+        if reply is None:
+            raise OperationError(err)
+        return clbk(reply, err)
@@ -41,6 +41,7 @@ from sovrin_client.cli.command import acceptLinkCmd, connectToCmd, \
 from sovrin_client.cli.helper import getNewClientGrams, \
     USAGE_TEXT, NEXT_COMMANDS_TO_TRY_TEXT
 from sovrin_client.client.client import Client
+from sovrin_client.client.ledger_sync import LedgerSync
 from sovrin_client.client.wallet.attribute import Attribute, LedgerStore
 from sovrin_client.client.wallet.link import Link, ClaimProofRequest
 from sovrin_client.client.wallet.node import Node
@@ -92,6 +93,8 @@ class SovrinCli(PlenumCli):
         self.aliases = {}  # type: Dict[str, Signer]
         self.sponsors = set()
         self.users = set()
+        # Syncs the active wallet with the ledger, kept across clients
+        self._ledgerSync = None  # type: LedgerSync
         super().__init__(*args, **kwargs)
         # Available environments
         self.envs = self.config.ENVS
@@ -333,10 +336,16 @@ class SovrinCli(PlenumCli):
 
         client = super().newClient(clientName, config=config)
         if self.activeWallet:
-            client.registerObserver(self.activeWallet.handleIncomingReply)
-            self.activeWallet.pendSyncRequests()
+            client.observeWallet(self.activeWallet)
             prepared = self.activeWallet.preparePending()
             client.submitReqs(*prepared)
+            if self._ledgerSync is None or \
+                    self._ledgerSync.wallet is not self.activeWallet:
+                self._ledgerSync = LedgerSync(client, self.activeWallet,
+                                              loop=self.looper.loop)
+            else:
+                self._ledgerSync.setClient(client)
+            self._ledgerSync.start()
 
         # If agent was created before the user connected to a test environment
         if self._agent:
@@ -408,7 +417,7 @@ class SovrinCli(PlenumCli):
         identity = Identity(identifier=nym)
         req = self.activeWallet.requestIdentity(
             identity, sender=self.activeWallet.defaultId)
-        self.activeClient.submitReqs(req)
+        self.activeClient.submitReqsDeduplicated(req)
         self.print("Getting nym {}".format(nym))
 
         def getNymReply(reply, err, *args):
@@ -1282,6 +1291,8 @@ class SovrinCli(PlenumCli):
             self.print("Disconnecting from {} ...".format(self.activeEnv))
 
         self._saveActiveWallet()
+        if self._activeClient and self._activeWallet:
+            self._activeClient.unobserveWallet(self._activeWallet)
         self._wallets = {}
         self._activeWallet = None
         self._activeClient = None
@@ -1564,6 +1575,9 @@ class DummyClient:
     def submitReqs(self, *reqs):
         pass
 
+    def unobserveWallet(self, wallet):
+        pass
+
     @property
     def hasSufficientConnections(self):
         pass
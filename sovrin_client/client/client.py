@@ -1,8 +1,11 @@
+import asyncio
 import json
+import os
+import time
 import traceback
 import uuid
-from collections import deque
-from typing import Dict, Union, Tuple, Optional, Callable
+from collections import deque, OrderedDict
+from typing import Dict, Union, Tuple, Optional, Callable, List
 
 import pyorient
 from base58 import b58decode, b58encode
@@ -22,17 +25,37 @@ from raet.raeting import AutoMode
 from sovrin_common.config_util import getConfig
 from sovrin_common.txn import TXN_TYPE, ATTRIB, DATA, GET_NYM, ROLE, \
     SPONSOR, NYM, GET_TXNS, LAST_TXN, TXNS, SCHEMA, ISSUER_KEY, SKEY, DISCLO,\
-    GET_ATTR
+    GET_ATTR, GET_SCHEMA, GET_ISSUER_KEY
+from sovrin_client.client.json_stream import iterObjectItems
 from sovrin_client.persistence.client_req_rep_store_file import ClientReqRepStoreFile
 from sovrin_client.persistence.client_req_rep_store_orientdb import \
     ClientReqRepStoreOrientDB
+from sovrin_client.persistence.client_req_rep_store_sqlite import \
+    ClientReqRepStoreSqlite
 from sovrin_client.persistence.client_txn_log import ClientTxnLog
+from sovrin_client.persistence.public_data_cache import PublicDataCache
 from sovrin_common.persistence.identity_graph import getEdgeByTxnType, IdentityGraph
 
 logger = getlogger()
 
 
 class Client(PlenumClient):
+    # Operations which only read from the ledger, and so can be deduplicated
+    dedupReadTypes = (GET_NYM, GET_ATTR, GET_SCHEMA, GET_ISSUER_KEY)
+    # Requests merged into an in-flight read older than this many seconds
+    # are sent on their own
+    DefaultDedupReadTimeout = 20
+    # Max number of merged request keys remembered once their read completed
+    MaxReadAliases = 10000
+    # Max number of nyms remembered to be stewards in the graph store
+    MaxKnownStewards = 10000
+    # Number of transactions of a GET_TXNS reply processed before yielding
+    # to the event loop
+    DefaultGetTxnsChunkSize = 100
+    # Observers taking longer than this many seconds to handle a reply are
+    # logged
+    DefaultSlowObserverThreshold = 0.1
+
     def __init__(self,
                  name: str,
                  nodeReg: Dict[str, HA] = None,
@@ -49,6 +72,7 @@ class Client(PlenumClient):
                          config,
                          sighex)
         self.graphStore = self.getGraphStore()
+        self.publicDataCache = self.getPublicDataCache()
         self.autoDiscloseAttributes = False
         self.requestedPendingTxns = False
         self.hasAnonCreds = bool(peerHA)
@@ -66,6 +90,38 @@ class Client(PlenumClient):
             self.peerInbox = deque()
         self._observers = {}  # type Dict[str, Callable]
         self._observerSet = set()  # makes it easier to guard against duplicates
+        # txn types and identifiers each observer subscribed to, None
+        # meaning all of them
+        self._observerFilters = {}  # type: Dict[str, Tuple[Optional[frozenset], Optional[frozenset]]]
+        # observers to notify, by txn type and identifier, filled on demand
+        # and cleared when observers change
+        self._observerTable = {}  # type: Dict[Tuple[str, str], List[Tuple[str, Callable]]]
+        # identifiers some observer subscribed to
+        self._observedIdentifiers = set()
+        # number of calls, total and max time spent, by observer name
+        self.observerTimings = {}  # type: Dict[str, List]
+        # callables undoing what was set up along with an observer, called
+        # when it is deregistered
+        self._observerCleanups = {}  # type: Dict[str, Callable]
+        self.slowObserverThreshold = getattr(
+            self.config, "ClientSlowObserverThreshold",
+            self.DefaultSlowObserverThreshold)
+        # futures waiting for consensus on a request
+        self._consensusWaiters = {}  # type: Dict[Tuple[str, int], List]
+        # read requests sent through `submitReqsDeduplicated` which are awaiting
+        # consensus, by serialized operation
+        self._inFlightReads = {}  # type: Dict[str, Tuple[Tuple[str, int], float]]
+        # serialized operation and keys of requests which were merged into an
+        # in-flight read, by the key of that read, and the reverse mapping
+        self._mergedReads = {}  # type: Dict[Tuple[str, int], Tuple[str, List]]
+        self._readAliases = OrderedDict()  # type: Dict[Tuple[str, int], Tuple[str, int]]
+        self.getTxnsChunkSize = getattr(self.config, "GetTxnsChunkSize",
+                                        self.DefaultGetTxnsChunkSize)
+        # GET_TXNS replies being processed
+        self._getTxnsTasks = set()
+        # Nyms known to be stewards in the graph store, least recently seen
+        # first. Cleared when the client is started again.
+        self._knownStewards = OrderedDict()  # type: Dict[str, None]
 
     def handlePeerMessage(self, msg):
         """
@@ -85,6 +141,8 @@ class Client(PlenumClient):
     def getReqRepStore(self):
         if self.config.ReqReplyStore == "orientdb":
             return ClientReqRepStoreOrientDB(self._getOrientDbStore())
+        elif self.config.ReqReplyStore == "sqlite":
+            return ClientReqRepStoreSqlite(self.name, self.basedirpath)
         else:
             return ClientReqRepStoreFile(self.name, self.basedirpath)
 
@@ -92,6 +150,13 @@ class Client(PlenumClient):
         return IdentityGraph(self._getOrientDbStore()) if \
             self.config.ClientIdentityGraph else None
 
+    def getPublicDataCache(self):
+        dataDir = os.path.join(self.basedirpath, "data", "clients",
+                               self.name) if self.basedirpath else None
+        return PublicDataCache(dataDir,
+                               maxSize=getattr(self.config,
+                                               "PublicDataCacheSize", None))
+
     def getTxnLogStore(self):
         return ClientTxnLog(self.name, self.basedirpath)
 
@@ -107,79 +172,297 @@ class Client(PlenumClient):
         super().handleOneNodeMsg(wrappedMsg, excludeFromCli)
         if OP_FIELD_NAME not in msg:
             logger.error("Op absent in message {}".format(msg))
+        elif excludeReqNacks and (self._consensusWaiters or
+                                  self._mergedReads):
+            # Enough nacks also complete a request, with an error
+            key = (msg.get(f.IDENTIFIER.nm), msg.get(f.REQ_ID.nm))
+            if key in self._consensusWaiters or key in self._mergedReads:
+                reply, err = self.replyIfConsensus(*key)
+                if reply is not None or err is not None:
+                    for k in [key, *self._completeRead(key)]:
+                        self._resolveConsensusWaiters(k, reply, err)
 
     def postReplyRecvd(self, identifier, reqId, frm, result, numReplies):
         reply = super().postReplyRecvd(identifier, reqId, frm, result, numReplies)
         if reply:
-            for name in self._observers:
-                try:
-                    self._observers[name](name, reqId, frm, result, numReplies)
-                except Exception as ex:
-                    # TODO: All errors should not be shown on CLI, or maybe we
-                    # show errors with different color according to the
-                    # severity. Like an error occurring due to node sending
-                    # a malformed message should not result in an error message
-                    # being shown on the cli since the clients would anyway
-                    # collect enough replies from other nodes.
-                    logger.debug("Observer threw an exception", exc_info=ex)
-            if isinstance(self.reqRepStore, ClientReqRepStoreOrientDB):
+            if (identifier, reqId) in self._consensusWaiters:
+                self._resolveConsensusWaiters(
+                    (identifier, reqId),
+                    *self.replyIfConsensus(identifier, reqId))
+            self._notifyObservers(reqId, frm, result, numReplies)
+            for mIdr, mReqId in self._completeRead((identifier, reqId)):
+                mResult = self._resultForMergedReq(result, mIdr, mReqId)
+                self._resolveConsensusWaiters((mIdr, mReqId), mResult, None)
+                self._notifyObservers(mReqId, frm, mResult, numReplies)
+            if self._storeTracksConsensus:
                 self.reqRepStore.setConsensus(identifier, reqId)
-            if result[TXN_TYPE] == NYM:
-                if self.graphStore:
-                    self.addNymToGraph(result)
-            elif result[TXN_TYPE] == ATTRIB:
-                if self.graphStore:
-                    self.graphStore.addAttribTxnToGraph(result)
+            if result[TXN_TYPE] in (NYM, ATTRIB, SCHEMA, ISSUER_KEY):
+                self.addTxnsToGraph([result])
             elif result[TXN_TYPE] == GET_NYM:
                 if self.graphStore:
                     if DATA in result and result[DATA]:
                         self.addNymToGraph(json.loads(result[DATA]))
             elif result[TXN_TYPE] == GET_TXNS:
                 if DATA in result and result[DATA]:
-                    data = json.loads(result[DATA])
-                    self.reqRepStore.setLastTxnForIdentifier(
-                        result[f.IDENTIFIER.nm], data[LAST_TXN])
-                    if self.graphStore:
-                        for txn in data[TXNS]:
-                            if txn[TXN_TYPE] == NYM:
-                                self.addNymToGraph(txn)
-                            elif txn[TXN_TYPE] == ATTRIB:
-                                try:
-                                    self.graphStore.addAttribTxnToGraph(txn)
-                                except pyorient.PyOrientCommandException as ex:
-                                    fault(ex, "An exception was raised while "
-                                              "adding attribute")
-
-            elif result[TXN_TYPE] == SCHEMA:
-                if self.graphStore:
-                    self.graphStore.addSchemaTxnToGraph(result)
-            elif result[TXN_TYPE] == ISSUER_KEY:
-                if self.graphStore:
-                    self.graphStore.addIssuerKeyTxnToGraph(result)
-                    # else:
-                    #    logger.debug("Unknown type {}".format(result[TXN_TYPE]))
+                    task = asyncio.ensure_future(self.processGetTxns(result))
+                    self._getTxnsTasks.add(task)
+                    task.add_done_callback(self._getTxnsProcessed)
+
+    async def processGetTxns(self, result):
+        """
+        Record the last transaction of a GET_TXNS reply and add its NYM and
+        ATTRIB transactions to the graph store. The transactions are decoded
+        one at a time and handled in chunks, yielding to the event loop
+        after each chunk so that large replies do not block it.
+        """
+        lastTxn = None
+        chunk = []
+        for key, value in iterObjectItems(result[DATA], streamKeys=(TXNS,)):
+            if key == LAST_TXN:
+                lastTxn = value
+            elif key == TXNS:
+                chunk.append(value)
+                if len(chunk) >= self.getTxnsChunkSize:
+                    self.addTxnsToGraph(chunk, types=(NYM, ATTRIB))
+                    chunk = []
+                    await asyncio.sleep(0)
+        self.addTxnsToGraph(chunk, types=(NYM, ATTRIB))
+        identifier = result[f.IDENTIFIER.nm]
+        if lastTxn is not None and self._isLaterTxn(identifier, lastTxn):
+            self.reqRepStore.setLastTxnForIdentifier(identifier, lastTxn)
+
+    def _isLaterTxn(self, identifier, lastTxn):
+        """
+        Whether `lastTxn` is after the last txn recorded for the identifier.
+        Replies to GET_TXNS requests can complete in any order, so the
+        recorded one must never go backwards.
+        """
+        recorded = self.reqRepStore.getLastTxnForIdentifier(identifier)
+        if recorded is None:
+            return True
+        try:
+            return int(lastTxn) > int(recorded)
+        except (TypeError, ValueError):
+            return True
+
+    def _getTxnsProcessed(self, task):
+        self._getTxnsTasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("{} failed to process GET_TXNS reply: {}".
+                         format(self, task.exception()),
+                         exc_info=task.exception())
+
+    def addTxnsToGraph(self, txns, types=(NYM, ATTRIB, SCHEMA, ISSUER_KEY)):
+        """
+        Add a batch of transactions of the given types to the graph store,
+        other transactions are ignored. The stewards sponsoring NYMs of the
+        batch are looked up, and added if missing, once for the whole batch
+        rather than before each NYM.
+        """
+        if not self.graphStore:
+            return
+        txns = [txn for txn in txns if txn.get(TXN_TYPE) in types]
+        self._ensureStewards(txn.get(f.IDENTIFIER.nm) for txn in txns
+                             if txn[TXN_TYPE] == NYM and
+                             txn.get(ROLE) == SPONSOR)
+        for txn in txns:
+            typ = txn[TXN_TYPE]
+            if typ == NYM:
+                self.graphStore.addNymTxnToGraph(txn)
+            elif typ == ATTRIB:
+                try:
+                    self.graphStore.addAttribTxnToGraph(txn)
+                except pyorient.PyOrientCommandException as ex:
+                    fault(ex, "An exception was raised while "
+                              "adding attribute")
+            elif typ == SCHEMA:
+                self.graphStore.addSchemaTxnToGraph(txn)
+            elif typ == ISSUER_KEY:
+                self.graphStore.addIssuerKeyTxnToGraph(txn)
+
+    def _ensureStewards(self, nyms):
+        """
+        Add the given nyms to the graph as stewards unless they are already
+        known to be. The last `MaxKnownStewards` stewards found or added are
+        remembered and not checked against the graph store again.
+        """
+        for nym in set(nyms):
+            if nym in self._knownStewards:
+                self._knownStewards.move_to_end(nym)
+                continue
+            if not self.graphStore.hasSteward(nym):
+                try:
+                    self.graphStore.addNym(None, nym=nym, role=STEWARD)
+                except pyorient.PyOrientCommandException as ex:
+                    logger.trace("Error occurred adding nym to graph")
+                    logger.trace(traceback.format_exc())
+                    continue
+            self._knownStewards[nym] = None
+            while len(self._knownStewards) > self.MaxKnownStewards:
+                self._knownStewards.popitem(last=False)
+
+    def _observersFor(self, txnType, identifier):
+        if identifier not in self._observedIdentifiers:
+            identifier = None
+        key = (txnType, identifier)
+        if key not in self._observerTable:
+            observers = []
+            for name, observer in self._observers.items():
+                txnTypes, identifiers = self._observerFilters[name]
+                if txnTypes is not None and txnType not in txnTypes:
+                    continue
+                if identifiers is not None and identifier not in identifiers:
+                    continue
+                observers.append((name, observer))
+            self._observerTable[key] = observers
+        return self._observerTable[key]
+
+    def _notifyObservers(self, reqId, frm, result, numReplies):
+        observers = self._observersFor(result.get(TXN_TYPE),
+                                       result.get(f.IDENTIFIER.nm))
+        # Observers may deregister themselves when notified
+        for name, observer in list(observers):
+            start = time.perf_counter()
+            try:
+                observer(name, reqId, frm, result, numReplies)
+            except Exception as ex:
+                # TODO: All errors should not be shown on CLI, or maybe we
+                # show errors with different color according to the
+                # severity. Like an error occurring due to node sending
+                # a malformed message should not result in an error message
+                # being shown on the cli since the clients would anyway
+                # collect enough replies from other nodes.
+                logger.debug("Observer threw an exception", exc_info=ex)
+            self._recordObserverTiming(name, time.perf_counter() - start)
+
+    def _recordObserverTiming(self, name, elapsed):
+        timing = self.observerTimings.get(name)
+        if timing is None:
+            return
+        timing[0] += 1
+        timing[1] += elapsed
+        timing[2] = max(timing[2], elapsed)
+        if elapsed > self.slowObserverThreshold:
+            logger.debug("{} observer {} took {:.3f} seconds".
+                         format(self, name, elapsed))
+
+    def submitReqsDeduplicated(self, *reqs):
+        """
+        Like `submitReqs`, but a read request whose operation is identical
+        to that of a read already in flight is not sent. It completes with
+        the reply of the in-flight read instead: observers are notified for
+        it, and `replyIfConsensus` and `awaitConsensus` return the reply for
+        its key. Only reads from the same sender are merged.
+
+        :return: the requests actually sent
+        """
+        toSend = []
+        now = time.perf_counter()
+        timeout = getattr(self.config, "ClientDedupReadTimeout",
+                          self.DefaultDedupReadTimeout)
+        for req in reqs:
+            if req.operation.get(TXN_TYPE) not in self.dedupReadTypes:
+                toSend.append(req)
+                continue
+            opKey = json.dumps([req.identifier, req.operation],
+                               sort_keys=True)
+            inFlight = self._inFlightReads.get(opKey)
+            if inFlight and now - inFlight[1] < timeout:
+                sentKey = inFlight[0]
+                self._mergedReads[sentKey][1].append(req.key)
+                self._readAliases[req.key] = sentKey
+                while len(self._readAliases) > self.MaxReadAliases:
+                    self._readAliases.popitem(last=False)
+                logger.debug("{} merged request {} into in-flight read {}".
+                             format(self, req.key, sentKey))
+                continue
+            # If the earlier read has not completed in time, later reads are
+            # no longer merged into it. The reads already merged into it
+            # still complete with its reply.
+            self._inFlightReads[opKey] = (req.key, now)
+            self._mergedReads[req.key] = (opKey, [])
+            toSend.append(req)
+        return self.submitReqs(*toSend) if toSend else []
+
+    def _completeRead(self, key):
+        """
+        Stop tracking a completed in-flight read and return the keys of the
+        requests merged into it
+        """
+        if key not in self._mergedReads:
+            return []
+        opKey, merged = self._mergedReads.pop(key)
+        if self._inFlightReads.get(opKey, (None,))[0] == key:
+            del self._inFlightReads[opKey]
+        return merged
+
+    @staticmethod
+    def _resultForMergedReq(result, identifier, reqId):
+        result = dict(result)
+        result[f.IDENTIFIER.nm] = identifier
+        result[f.REQ_ID.nm] = reqId
+        return result
+
+    def replyIfConsensus(self, identifier, reqId: int):
+        sentKey = self._readAliases.get((identifier, reqId))
+        if sentKey:
+            reply, err = super().replyIfConsensus(*sentKey)
+            if reply is not None:
+                reply = self._resultForMergedReq(reply, identifier, reqId)
+            return reply, err
+        return super().replyIfConsensus(identifier, reqId)
+
+    def _resolveConsensusWaiters(self, key, reply, err):
+        for fut in self._consensusWaiters.pop(key, []):
+            if not fut.done():
+                fut.set_result((reply, err))
+
+    async def awaitConsensus(self, identifier: str, reqId: int,
+                             timeout: float = None):
+        """
+        Wait until f+1 matching replies or nacks are received for a request.
+        Completes as soon as the reply or nack that makes consensus arrives,
+        or immediately if consensus was already reached.
+
+        :return: tuple of (reply, error) as returned by `replyIfConsensus`
+        :raises asyncio.TimeoutError: if no consensus is reached in time
+        """
+        key = (identifier, reqId)
+        reply, err = self.replyIfConsensus(*key)
+        if reply is not None or err is not None:
+            return reply, err
+        fut = asyncio.get_event_loop().create_future()
+        self._consensusWaiters.setdefault(key, []).append(fut)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            waiters = self._consensusWaiters.get(key)
+            if waiters is not None:
+                if fut in waiters:
+                    waiters.remove(fut)
+                if not waiters:
+                    del self._consensusWaiters[key]
+
+    @property
+    def _storeTracksConsensus(self):
+        return isinstance(self.reqRepStore, (ClientReqRepStoreOrientDB,
+                                             ClientReqRepStoreSqlite))
 
     def requestConfirmed(self, identifier: str, reqId: int) -> bool:
-        if isinstance(self.reqRepStore, ClientReqRepStoreOrientDB):
+        if self._storeTracksConsensus:
             return self.reqRepStore.requestConfirmed(identifier, reqId)
         else:
             return self.txnLog.hasTxnWithReqId(identifier, reqId)
 
     def hasConsensus(self, identifier: str, reqId: int) -> Optional[str]:
-        if isinstance(self.reqRepStore, ClientReqRepStoreOrientDB):
+        if self._storeTracksConsensus:
             return self.reqRepStore.hasConsensus(identifier, reqId)
         else:
             return super().hasConsensus(identifier, reqId)
 
     def addNymToGraph(self, txn):
-        origin = txn.get(f.IDENTIFIER.nm)
         if txn.get(ROLE) == SPONSOR:
-            if not self.graphStore.hasSteward(origin):
-                try:
-                    self.graphStore.addNym(None, nym=origin, role=STEWARD)
-                except pyorient.PyOrientCommandException as ex:
-                    logger.trace("Error occurred adding nym to graph")
-                    logger.trace(traceback.format_exc())
+            self._ensureStewards([txn.get(f.IDENTIFIER.nm)])
         self.graphStore.addNymTxnToGraph(txn)
 
     def getTxnById(self, txnId: str):
@@ -205,7 +488,7 @@ class Client(PlenumClient):
                     return [r.oRecordData for r in result]
             return []
         else:
-            txns = self.txnLog.getTxnsByType(txnType)
+            txns = list(self.txnLog.getTxnsByType(txnType))
             # TODO: Fix ASAP
             if txnType == SCHEMA:
                 for txn in txns:
@@ -251,16 +534,15 @@ class Client(PlenumClient):
         if self.graphStore:
             return self.graphStore.hasNym(nym)
         else:
-            for txn in self.txnLog.getTxnsByType(NYM):
-                if txn.get(TXN_TYPE) == NYM:
-                    return True
-            return False
+            return self.txnLog.hasNym(nym)
 
     def _statusChanged(self, old, new):
         super()._statusChanged(old, new)
 
     def start(self, loop):
         super().start(loop)
+        # The graph store may have changed while the client was stopped
+        self._knownStewards.clear()
         if self.hasAnonCreds and self.status not in Status.going():
             self.peerStack.start()
 
@@ -270,24 +552,89 @@ class Client(PlenumClient):
         #     await self.nodestack.serviceLifecycle()
         # self.nodestack.flushOutBoxes()
         s = await super().prod(limit)
+        if isinstance(self.reqRepStore, ClientReqRepStoreOrientDB):
+            # Send the writes queued by this cycle's messages in one batch
+            self.reqRepStore.flush()
         if self.hasAnonCreds:
             return s + await self.peerStack.service(limit)
         else:
             return s
 
-    def registerObserver(self, observer: Callable, name=None):
+    def registerObserver(self, observer: Callable, name=None,
+                         txnTypes=None, identifiers=None):
+        """
+        Register a callable to be notified of replies that reached consensus.
+        If `txnTypes` or `identifiers` are given, only replies of those txn
+        types or for those identifiers are passed to it.
+        """
         if not name:
             name = uuid.uuid4()
         if name in self._observers or observer in self._observerSet:
             raise RuntimeError("Observer {} already registered".format(name))
         self._observers[name] = observer
         self._observerSet.add(observer)
+        self._observerFilters[name] = (
+            frozenset(txnTypes) if txnTypes is not None else None,
+            frozenset(identifiers) if identifiers is not None else None)
+        self.observerTimings[name] = [0, 0.0, 0.0]
+        self._observersChanged()
+
+    def observeWallet(self, wallet):
+        """
+        Register the wallet to be notified of the replies for its own
+        identifiers, including the identifiers added to it later
+        """
+        observer = wallet.handleIncomingReply
+        if self.hasObserver(observer):
+            return
+        name = uuid.uuid4()
+        self.registerObserver(observer, name=name,
+                              identifiers=wallet.idsToSigners.keys())
+
+        def identifierAdded(identifier):
+            self.setObserverIdentifiers(name, wallet.idsToSigners.keys())
+
+        wallet.addIdentifierListener(identifierAdded)
+        self._observerCleanups[name] = \
+            lambda: wallet.removeIdentifierListener(identifierAdded)
+
+    def unobserveWallet(self, wallet):
+        """
+        Stop notifying the wallet of replies, undoing `observeWallet`
+        """
+        for name, observer in list(self._observers.items()):
+            if observer == wallet.handleIncomingReply:
+                self.deregisterObserver(name)
+
+    def setObserverIdentifiers(self, name, identifiers):
+        """
+        Change the identifiers an observer is notified of replies for, None
+        meaning all of them
+        """
+        txnTypes, _ = self._observerFilters[name]
+        self._observerFilters[name] = (
+            txnTypes,
+            frozenset(identifiers) if identifiers is not None else None)
+        self._observersChanged()
 
     def deregisterObserver(self, name):
         if name not in self._observers:
             raise RuntimeError("Observer {} not registered".format(name))
         self._observerSet.remove(self._observers[name])
         del self._observers[name]
+        del self._observerFilters[name]
+        del self.observerTimings[name]
+        cleanup = self._observerCleanups.pop(name, None)
+        if cleanup:
+            cleanup()
+        self._observersChanged()
+
+    def _observersChanged(self):
+        self._observerTable.clear()
+        self._observedIdentifiers = set()
+        for _, identifiers in self._observerFilters.values():
+            if identifiers:
+                self._observedIdentifiers.update(identifiers)
 
     def hasObserver(self, name):
         return name in self._observerSet
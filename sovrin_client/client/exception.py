@@ -0,0 +1,7 @@
+class OperationError(RuntimeError):
+    """
+    Raised when the pool rejects a request, `error` is the reason it gave
+    """
+    def __init__(self, error):
+        super().__init__('Request rejected: {}'.format(error))
+        self.error = error
@@ -0,0 +1,93 @@
+import json
+import re
+from typing import Any, Iterable, Iterator, Tuple
+
+_WHITESPACE = re.compile(r'\s*')
+_decoder = json.JSONDecoder()
+
+
+def _skipWhitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    pos = _skipWhitespace(text, pos)
+    if text[pos:pos + 1] != char:
+        raise ValueError("Expected '{}' at position {}".format(char, pos))
+    return pos + 1
+
+
+def _skipValue(text: str, pos: int) -> int:
+    """
+    Return the position just after the JSON value starting at `pos` without
+    decoding it
+    """
+    pos = _skipWhitespace(text, pos)
+    if text[pos:pos + 1] not in ('[', '{'):
+        return _decoder.raw_decode(text, pos)[1]
+    depth = 0
+    inString = False
+    while pos < len(text):
+        char = text[pos]
+        if inString:
+            if char == '\\':
+                pos += 1
+            elif char == '"':
+                inString = False
+        elif char == '"':
+            inString = True
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise ValueError("Unterminated JSON value")
+
+
+def _iterArray(text: str, pos: int, key: str):
+    """
+    Yield (key, element) for each element of the array starting at `pos`,
+    returning the position just after the array
+    """
+    pos = _expect(text, pos, '[')
+    pos = _skipWhitespace(text, pos)
+    if text[pos:pos + 1] == ']':
+        return pos + 1
+    while True:
+        value, pos = _decoder.raw_decode(text, _skipWhitespace(text, pos))
+        yield key, value
+        pos = _skipWhitespace(text, pos)
+        if text[pos:pos + 1] == ']':
+            return pos + 1
+        pos = _expect(text, pos, ',')
+
+
+def iterObjectItems(text: str, streamKeys: Iterable[str] = (),
+                    skipKeys: Iterable[str] = ()) \
+        -> Iterator[Tuple[str, Any]]:
+    """
+    Yield the (key, value) pairs of a serialized JSON object one at a time.
+    Arrays under `streamKeys` are not decoded at once, each of their elements
+    is yielded as a separate (key, element) pair. Values under `skipKeys` are
+    skipped without being decoded.
+    """
+    pos = _expect(text, 0, '{')
+    pos = _skipWhitespace(text, pos)
+    if text[pos:pos + 1] == '}':
+        return
+    while True:
+        key, pos = _decoder.raw_decode(text, _skipWhitespace(text, pos))
+        pos = _expect(text, pos, ':')
+        if key in skipKeys:
+            pos = _skipValue(text, pos)
+        elif key in streamKeys:
+            pos = yield from _iterArray(text, pos, key)
+        else:
+            value, pos = _decoder.raw_decode(text, _skipWhitespace(text, pos))
+            yield key, value
+        pos = _skipWhitespace(text, pos)
+        if text[pos:pos + 1] == '}':
+            return
+        pos = _expect(text, pos, ',')
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+from plenum.common.log import getlogger
+from plenum.common.txn import TXN_TYPE, DATA
+from plenum.common.types import f
+
+from sovrin_client.client.json_stream import iterObjectItems
+from sovrin_common.txn import GET_TXNS, LAST_TXN, TXNS
+
+logger = getlogger()
+
+
+class LedgerSync:
+    """
+    Syncs a wallet's identifiers with the ledger using GET_TXNS requests,
+    keeping at most `maxInFlight` of them outstanding at a time instead of
+    sending one request per identifier at once. Each request resumes from
+    the last transaction the wallet knows for its identifier (the wallet's
+    `lastKnownSeqs`), which the wallet updates from GET_TXNS replies.
+
+    Requests that get no reply within `reqTimeout` seconds are sent again.
+    They are checked for whenever a reply arrives, and every `reqTimeout`
+    seconds while the sync is not done.
+
+    A wallet should keep a single LedgerSync, moved to another client with
+    `setClient`, so that identifiers it already synced are not synced again.
+
+    When `paged` is set, for nodes which return a limited number of
+    transactions per GET_TXNS reply, an identifier is only considered synced
+    once a reply brings no transactions newer than those already known, each
+    reply being followed by a request for the next page.
+    """
+
+    DefaultMaxInFlight = 50
+    DefaultReqTimeout = 60
+
+    def __init__(self, client, wallet, maxInFlight: int = None,
+                 reqTimeout: float = None, paged: bool = None, loop=None):
+        self.client = client
+        self.wallet = wallet
+        self.loop = loop or asyncio.get_event_loop()
+        self.maxInFlight = maxInFlight or getattr(
+            client.config, "LedgerSyncMaxInFlight", self.DefaultMaxInFlight)
+        self.reqTimeout = reqTimeout or getattr(
+            client.config, "LedgerSyncReqTimeout", self.DefaultReqTimeout)
+        self.paged = paged if paged is not None else getattr(
+            client.config, "LedgerSyncPaged", False)
+        self._queue = deque()
+        # identifier, send time and last known transaction of requests
+        # awaiting reply, by request key
+        self._inFlight = {}  # type: Dict[Tuple[str, int], Tuple[str, float, str]]
+        self.synced = set()
+        self._observerName = "{}-{}".format(type(self).__name__, id(self))
+        # Timer checking for requests that timed out
+        self._expiryTimer = None
+
+    @property
+    def isDone(self):
+        return not self._queue and not self._inFlight
+
+    def start(self, *identifiers):
+        """
+        Sync the given identifiers, or all of the wallet's identifiers if
+        none are given. Identifiers already synced by this instance are
+        skipped, so calling it again resumes an interrupted sync.
+        """
+        self.expireInFlight()
+        pending = set(self._queue)
+        pending.update(entry[0] for entry in self._inFlight.values())
+        for identifier in (identifiers or self.wallet.idsToSigners.keys()):
+            if identifier not in self.synced and identifier not in pending:
+                self._queue.append(identifier)
+                pending.add(identifier)
+        if not self.client.hasObserver(self.handleReply):
+            self.client.registerObserver(self.handleReply,
+                                         name=self._observerName,
+                                         txnTypes=(GET_TXNS,))
+        self._sendNext()
+        self._scheduleExpiry()
+
+    def setClient(self, client):
+        """
+        Continue the sync through another client. Requests awaiting a reply
+        through the previous client are sent again.
+        """
+        if client is self.client:
+            return
+        if self.client.hasObserver(self.handleReply):
+            self.client.deregisterObserver(self._observerName)
+        self._queue.extendleft(entry[0] for entry in self._inFlight.values())
+        self._inFlight.clear()
+        self.client = client
+
+    def expireInFlight(self, now=None):
+        """
+        Give up waiting for replies to requests sent more than `reqTimeout`
+        seconds ago, their identifiers are queued to be requested again
+        """
+        now = now or time.perf_counter()
+        for key, (identifier, sentAt, _) in list(self._inFlight.items()):
+            if now - sentAt >= self.reqTimeout:
+                logger.debug("{} timed out waiting for GET_TXNS reply for {}".
+                             format(self.client, identifier))
+                del self._inFlight[key]
+                self._queue.append(identifier)
+
+    def _scheduleExpiry(self):
+        if self._expiryTimer is None and not self.isDone:
+            self._expiryTimer = self.loop.call_later(self.reqTimeout,
+                                                     self._expiryDue)
+
+    def _expiryDue(self):
+        self._expiryTimer = None
+        self.expireInFlight()
+        self._sendNext()
+        self._scheduleExpiry()
+
+    def _sendNext(self):
+        count = self.maxInFlight - len(self._inFlight)
+        identifiers = []
+        while self._queue and len(identifiers) < count:
+            identifiers.append(self._queue.popleft())
+        if not identifiers:
+            return
+        reqs = self.wallet.prepareTxnRequests(*identifiers)
+        now = time.perf_counter()
+        for req in reqs:
+            self._inFlight[req.key] = (
+                req.identifier, now,
+                self.wallet.getLastKnownSeqs(req.identifier))
+        self.client.submitReqs(*reqs)
+
+    @staticmethod
+    def _lastTxnOf(result):
+        if not result.get(DATA):
+            return None
+        # The transactions themselves are skipped, not decoded
+        for key, value in iterObjectItems(result[DATA], skipKeys=(TXNS,)):
+            if key == LAST_TXN:
+                return value
+
+    def handleReply(self, observerName, reqId, frm, result, numReplies):
+        if result.get(TXN_TYPE) != GET_TXNS:
+            return
+        entry = self._inFlight.pop((result.get(f.IDENTIFIER.nm), reqId), None)
+        if entry is None:
+            return
+        identifier, _, fromTxn = entry
+        lastTxn = self._lastTxnOf(result) if self.paged else None
+        if lastTxn and lastTxn != fromTxn:
+            # Fetch the next page, starting after this one
+            self.wallet.addLastKnownSeqs(identifier, lastTxn)
+            self._queue.append(identifier)
+        else:
+            self.synced.add(identifier)
+        self.expireInFlight()
+        self._sendNext()
+        if self.isDone:
+            self.client.deregisterObserver(self._observerName)
+            if self._expiryTimer is not None:
+                self._expiryTimer.cancel()
+                self._expiryTimer = None
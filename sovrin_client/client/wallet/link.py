@@ -38,6 +38,12 @@ class constant:
 
 
 class Link:
+    # Fields on which the owning wallet keeps secondary indexes, any change
+    # to them is reported to the registered field change listener
+    indexedFields = ('remoteIdentifier', 'invitationNonce', 'internalId')
+    # Fields whose names the owning wallet keeps in its search indexes
+    searchableFields = ('availableClaims', 'claimProofRequests')
+
     def __init__(self,
                  name,
                  localIdentifier=None,
@@ -70,6 +76,51 @@ class Link:
     def __repr__(self):
         return self.key
 
+    def __setattr__(self, name, value):
+        if name in self.indexedFields or name in self.searchableFields:
+            oldValue = self.__dict__.get(name)
+            super().__setattr__(name, value)
+            if oldValue != value:
+                self._notifyFieldChanged(name, oldValue, value)
+        else:
+            super().__setattr__(name, value)
+
+    def _notifyFieldChanged(self, name, oldValue, newValue):
+        listener = self.__dict__.get('_fieldChangeListener')
+        if listener:
+            listener(self, name, oldValue, newValue)
+
+    def __getstate__(self):
+        # The listener is bound to the owning wallet which registers itself
+        # again when it indexes its links, so it is not persisted
+        state = self.__dict__.copy()
+        state.pop('_fieldChangeListener', None)
+        return state
+
+    def setFieldChangeListener(self, listener):
+        """
+        Register a callable that is invoked as
+        `listener(link, fieldName, oldValue, newValue)` whenever one of
+        `indexedFields` changes
+        """
+        self.__dict__['_fieldChangeListener'] = listener
+
+    def addAvailableClaims(self, claims):
+        """
+        Add (name, version, origin) tuples to the available claims. Use this
+        rather than mutating `availableClaims` in place so that the owning
+        wallet's search index stays current.
+        """
+        if claims:
+            self.availableClaims.extend(claims)
+            self._notifyFieldChanged('availableClaims', None,
+                                     self.availableClaims)
+
+    def addClaimProofRequest(self, claimProofRequest):
+        self.claimProofRequests.append(claimProofRequest)
+        self._notifyFieldChanged('claimProofRequests', None,
+                                 self.claimProofRequests)
+
     @property
     def key(self):
         return self.name
@@ -0,0 +1,100 @@
+from typing import Dict, Hashable, Iterable, List, Set
+
+
+class NGramIndex:
+    """
+    Incrementally maintained, case-insensitive substring index.
+
+    Each key is associated with one or more texts. Every n-gram (of length 1
+    up to `maxGramLen`) of every text is mapped to the keys having it, so a
+    search for a needle only looks at keys sharing the needle's n-grams
+    instead of at every key. Matches are the same as a lowercase
+    `needle in text` test and are returned in the order keys were first added.
+    """
+
+    def __init__(self, maxGramLen: int = 3):
+        assert maxGramLen > 0
+        self.maxGramLen = maxGramLen
+        self._grams = {}  # type: Dict[str, Set[Hashable]]
+        self._texts = {}  # type: Dict[Hashable, Set[str]]
+        self._order = {}  # type: Dict[Hashable, int]
+        self._nextOrder = 0
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, key):
+        return key in self._texts
+
+    def _gramsOf(self, text: str):
+        grams = set()
+        for n in range(1, self.maxGramLen + 1):
+            for i in range(len(text) - n + 1):
+                grams.add(text[i:i + n])
+        return grams
+
+    def set(self, key: Hashable, texts: Iterable[str]):
+        """
+        Associate `key` with `texts`, replacing any texts it had before. A key
+        keeps its original position in the results if it is already present.
+        """
+        texts = {t.lower() for t in texts}
+        old = self._texts.get(key)
+        if old is None:
+            self._order[key] = self._nextOrder
+            self._nextOrder += 1
+            old = set()
+        oldGrams = set()
+        for text in old:
+            oldGrams.update(self._gramsOf(text))
+        newGrams = set()
+        for text in texts:
+            newGrams.update(self._gramsOf(text))
+        for gram in oldGrams - newGrams:
+            self._discard(gram, key)
+        for gram in newGrams - oldGrams:
+            self._grams.setdefault(gram, set()).add(key)
+        self._texts[key] = texts
+
+    def remove(self, key: Hashable):
+        texts = self._texts.pop(key, None)
+        if texts is None:
+            return
+        del self._order[key]
+        for text in texts:
+            for gram in self._gramsOf(text):
+                self._discard(gram, key)
+
+    def _discard(self, gram, key):
+        keys = self._grams.get(gram)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._grams[gram]
+
+    def search(self, needle: str) -> List[Hashable]:
+        """
+        Return keys having at least one text which contains `needle`,
+        ignoring case
+        """
+        needle = needle.lower()
+        if not needle:
+            matched = [k for k, texts in self._texts.items() if texts]
+        elif len(needle) <= self.maxGramLen:
+            matched = self._grams.get(needle, ())
+        else:
+            postings = []
+            for i in range(len(needle) - self.maxGramLen + 1):
+                keys = self._grams.get(needle[i:i + self.maxGramLen])
+                if not keys:
+                    return []
+                postings.append(keys)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for keys in postings[1:]:
+                candidates.intersection_update(keys)
+                if not candidates:
+                    return []
+            matched = [k for k in candidates
+                       if any(needle in t for t in self._texts[k])]
+        return sorted(matched, key=self._order.__getitem__)
@@ -1,7 +1,9 @@
+import asyncio
 import datetime
 import json
-import operator
-from collections import deque
+import threading
+import time
+from collections import deque, OrderedDict
 from typing import Dict, List
 from typing import Optional
 
@@ -13,15 +15,19 @@ from plenum.common.txn import TXN_TYPE, TARGET_NYM, DATA, \
     IDENTIFIER, NYM, ROLE, VERKEY, NODE
 from plenum.common.types import Identifier, f
 
+from sovrin_client.client.json_stream import iterObjectItems
 from sovrin_client.client.wallet.attribute import Attribute, AttributeKey
 from sovrin_client.client.wallet.link import Link
+from sovrin_client.client.wallet.ngram_index import NGramIndex
 from sovrin_client.client.wallet.node import Node
 from sovrin_client.client.wallet.sponsoring import Sponsoring
 from sovrin_client.client.wallet.upgrade import Upgrade
 from sovrin_common.did_method import DefaultDidMethods
 from sovrin_common.exceptions import LinkNotFound
 from sovrin_common.identity import Identity
-from sovrin_common.txn import ATTRIB, GET_TXNS, GET_ATTR, GET_NYM, POOL_UPGRADE
+from sovrin_common.types import Request
+from sovrin_common.txn import ATTRIB, GET_TXNS, GET_ATTR, GET_NYM, \
+    POOL_UPGRADE, LAST_TXN, TXNS
 
 ENCODING = "utf-8"
 
@@ -53,9 +59,19 @@ class Wallet(PWallet, Sponsoring):
         self._pending = deque()  # type Tuple[Request, Tuple[str, Identifier,
         #  Optional[Identifier]]
 
-        # pending transactions that have been prepared (probably submitted)
-        self._prepared = {}  # type: Dict[(Identifier, int), Request]
+        # pending transactions that have been prepared (probably submitted),
+        # in the order they were prepared. They are released once their
+        # reply is handled or after `PreparedTimeout` seconds
+        self._prepared = OrderedDict()  # type: Dict[(Identifier, int), Request]
+        self._preparedTimes = {}  # type: Dict[(Identifier, int), float]
+        self.preparedCompleted = 0
+        self.preparedExpired = 0
         self.lastKnownSeqs = {}  # type: Dict[str, int]
+        # Callables notified of identifiers added to the wallet, not persisted
+        self._identifierListeners = []
+        # Held while signing, which `preparePendingAsync` does on a worker
+        # thread, not persisted
+        self._signLock = threading.Lock()
 
         self.replyHandler = {
             ATTRIB: self._attribReply,
@@ -67,6 +83,143 @@ class Wallet(PWallet, Sponsoring):
             POOL_UPGRADE: self._poolUpgradeReply
         }
 
+    # Seconds after which a prepared request without a reply is released
+    PreparedTimeout = 600
+    # Max number of prepared requests kept, the oldest are released first
+    MaxPrepared = 10000
+    # Defaults for wallets persisted before prepared requests were released
+    preparedCompleted = 0
+    preparedExpired = 0
+
+    # Secondary indexes over `_links`, derived from the links themselves and so
+    # not persisted with the wallet but built on first use
+    _linkIndexAttrs = ('_linkIndexes', '_linkNameIndex',
+                       '_availableClaimIndex', '_claimProofReqIndex')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attr in self._linkIndexAttrs:
+            state.pop(attr, None)
+        state.pop('_identifierListeners', None)
+        state.pop('_signLock', None)
+        # Requests which expired are not persisted, though they are left
+        # in the wallet itself until it expires them
+        expired = self._expiredPreparedCount(time.time())
+        if expired:
+            keys = list(self._prepared)[expired:]
+            state['_prepared'] = OrderedDict(
+                (k, self._prepared[k]) for k in keys)
+            state['_preparedTimes'] = {k: self._preparedTimes[k]
+                                       for k in keys
+                                       if k in self._preparedTimes}
+            state['preparedExpired'] = self.preparedExpired + expired
+        return state
+
+    def __getattr__(self, name):
+        # Only called for attributes which are not set. jsonpickle restores
+        # wallets persisted without a state, such as those saved before
+        # these attributes existed, without calling `__setstate__`
+        if name in self._linkIndexAttrs:
+            self._initLinkIndexes()
+            return self.__dict__[name]
+        if name == '_identifierListeners':
+            self._identifierListeners = []
+            return self._identifierListeners
+        if name == '_preparedTimes':
+            # Wallet persisted before prepared requests were released
+            now = time.time()
+            self._preparedTimes = {k: now for k in self._prepared}
+            return self._preparedTimes
+        if name == '_signLock':
+            self._signLock = threading.Lock()
+            return self._signLock
+        raise AttributeError("'{}' object has no attribute '{}'".
+                             format(type(self).__name__, name))
+
+    def addIdentifier(self, *args, **kwargs):
+        identifier, signer = super().addIdentifier(*args, **kwargs)
+        for listener in self._identifierListeners:
+            listener(identifier)
+        return identifier, signer
+
+    def addIdentifierListener(self, listener):
+        """
+        Have `listener` called with each identifier added to the wallet
+        """
+        self._identifierListeners.append(listener)
+
+    def removeIdentifierListener(self, listener):
+        if listener in self._identifierListeners:
+            self._identifierListeners.remove(listener)
+
+    def _initLinkIndexes(self):
+        # Maps a link field name to a dictionary of field value to the keys of
+        # links having that value
+        self._linkIndexes = {fieldName: {} for fieldName in Link.indexedFields}
+        # Substring search indexes over link names, available claim names
+        # and claim proof request names, each keyed by link key
+        self._linkNameIndex = NGramIndex()
+        self._availableClaimIndex = NGramIndex()
+        self._claimProofReqIndex = NGramIndex()
+        for link in self._links.values():
+            self._indexLink(link)
+
+    def _indexLink(self, link: Link):
+        for fieldName in Link.indexedFields:
+            self._addToLinkIndex(fieldName, getattr(link, fieldName), link.key)
+        self._linkNameIndex.set(link.key, [link.key])
+        for fieldName in Link.searchableFields:
+            self._updateLinkSearchIndex(link, fieldName)
+        link.setFieldChangeListener(self._linkFieldChanged)
+
+    def _unindexLink(self, link: Link):
+        for fieldName in Link.indexedFields:
+            self._removeFromLinkIndex(fieldName, getattr(link, fieldName),
+                                      link.key)
+        link.setFieldChangeListener(None)
+
+    def _updateLinkSearchIndex(self, link: Link, fieldName):
+        if fieldName == 'availableClaims':
+            self._availableClaimIndex.set(
+                link.key, [cl[0] for cl in link.availableClaims])
+        elif fieldName == 'claimProofRequests':
+            self._claimProofReqIndex.set(
+                link.key, [cpr.name for cpr in link.claimProofRequests])
+
+    def reindexLink(self, link: Link):
+        """
+        Refresh the search indexes of a link whose claims were mutated
+        directly rather than through the link's `add*` methods
+        """
+        for fieldName in Link.searchableFields:
+            self._updateLinkSearchIndex(link, fieldName)
+
+    def _addToLinkIndex(self, fieldName, value, linkKey):
+        self._linkIndexes[fieldName].setdefault(value, {})[linkKey] = None
+
+    def _removeFromLinkIndex(self, fieldName, value, linkKey):
+        keys = self._linkIndexes[fieldName].get(value)
+        if keys is not None:
+            keys.pop(linkKey, None)
+            if not keys:
+                del self._linkIndexes[fieldName][value]
+
+    def _linkFieldChanged(self, link: Link, fieldName, oldValue, newValue):
+        if self._links.get(link.key) is not link:
+            # The link has been replaced in the wallet
+            link.setFieldChangeListener(None)
+            return
+        if fieldName in Link.indexedFields:
+            self._removeFromLinkIndex(fieldName, oldValue, link.key)
+            self._addToLinkIndex(fieldName, newValue, link.key)
+        else:
+            self._updateLinkSearchIndex(link, fieldName)
+
+    def _getLinkByField(self, fieldName, value) -> Optional[Link]:
+        keys = self._linkIndexes[fieldName].get(value)
+        if keys:
+            return self._links[next(iter(keys))]
+
     @property
     def pendingCount(self):
         return len(self._pending)
@@ -83,7 +236,8 @@ class Wallet(PWallet, Sponsoring):
     # TODO: Few of the below methods have duplicate code, need to refactor it
     def getMatchingLinksWithAvailableClaim(self, claimName=None):
         matchingLinkAndAvailableClaim = []
-        for k, li in self._links.items():
+        for k in self._availableClaimIndex.search(claimName or ''):
+            li = self._links[k]
             for cl in li.availableClaims:
                 if not claimName or Wallet._isMatchingName(claimName, cl[0]):
                     matchingLinkAndAvailableClaim.append((li, cl))
@@ -91,7 +245,8 @@ class Wallet(PWallet, Sponsoring):
 
     def getMatchingLinksWithClaimReq(self, claimReqName, linkName=None):
         matchingLinkAndClaimReq = []
-        for k, li in self._links.items():
+        for k in self._claimProofReqIndex.search(claimReqName):
+            li = self._links[k]
             for cpr in li.claimProofRequests:
                 if Wallet._isMatchingName(claimReqName, cpr.name):
                     if linkName is None or Wallet._isMatchingName(linkName,
@@ -157,7 +312,11 @@ class Wallet(PWallet, Sponsoring):
         return [a for a in self._attributes.values() if a.dest == idr]
 
     def addLink(self, link: Link):
+        existing = self._links.get(link.key)
+        if existing is not None:
+            self._unindexLink(existing)
         self._links[link.key] = link
+        self._indexLink(link)
 
     def getLink(self, name, required=False) -> Link:
         l = self._links.get(name)
@@ -190,21 +349,64 @@ class Wallet(PWallet, Sponsoring):
             requests.append(self.signOp(op, identifier=identifier))
         return requests
 
+    def prepareTxnRequests(self, *identifiers):
+        """
+        Create GET_TXNS requests for the given identifiers and mark them as
+        prepared without going through the pending queue
+        """
+        requests = self.getPendingTxnRequests(*identifiers)
+        self._addPrepared({(req.identifier, req.reqId): (req, None)
+                           for req in requests})
+        return requests
+
     def pendSyncRequests(self):
         pendingTxnsReqs = self.getPendingTxnRequests()
         for req in pendingTxnsReqs:
             self.pendRequest(req)
 
-    def preparePending(self):
-        new = {}
-        while self._pending:
-            req, key = self._pending.pop()
-            sreq = self.signRequest(req)
-            new[req.identifier, req.reqId] = sreq, key
-        self._prepared.update(new)
-        # Return request in the order they were submitted
-        return sorted([req for req, _ in new.values()],
-                      key=operator.attrgetter("reqId"))
+    def preparePending(self, limit: int = None):
+        """
+        Sign pending requests, at most `limit` of them, and mark them as
+        prepared. Requests are returned in the order they were submitted.
+        """
+        pending = self._popPending(limit)
+        return self._addSigned(pending,
+                               self.signRequests([req for req, _ in pending]))
+
+    async def preparePendingAsync(self, limit: int = None, executor=None,
+                                  loop=None):
+        """
+        Like `preparePending` but the requests are signed on a worker thread
+        of `executor`, the default executor of `loop` if not given, so that
+        signing many requests does not block the event loop. Each request is
+        signed holding the wallet's signing lock, so the wallet may sign other
+        requests meanwhile.
+        """
+        loop = loop or asyncio.get_event_loop()
+        pending = self._popPending(limit)
+        signed = await loop.run_in_executor(
+            executor, self.signRequests, [req for req, _ in pending])
+        return self._addSigned(pending, signed)
+
+    def signRequest(self, *args, **kwargs):
+        with self._signLock:
+            return super().signRequest(*args, **kwargs)
+
+    def signRequests(self, reqs: List[Request]) -> List[Request]:
+        return [self.signRequest(req) for req in reqs]
+
+    def _popPending(self, limit=None):
+        # Requests are added to the left of `_pending`, so popping from the
+        # right gives them in the order they were submitted
+        count = len(self._pending) if limit is None \
+            else min(limit, len(self._pending))
+        return [self._pending.pop() for _ in range(count)]
+
+    def _addSigned(self, pending, signed):
+        self._addPrepared(OrderedDict(
+            ((sreq.identifier, sreq.reqId), (sreq, key))
+            for sreq, (_, key) in zip(signed, pending)))
+        return signed
 
     def handleIncomingReply(self, observer_name, reqId, frm, result,
                             numReplies):
@@ -222,6 +424,64 @@ class Wallet(PWallet, Sponsoring):
             self.replyHandler[typ](result, preparedReq)
             # else:
             #    raise NotImplementedError('No handler for {}'.format(typ))
+        self.releasePrepared((result[IDENTIFIER], reqId))
+
+    def releasePrepared(self, key) -> bool:
+        """
+        Release a prepared request whose reply was handled, whether by
+        `handleIncomingReply` or by whoever awaited the reply
+
+        :return: whether the request was still prepared
+        """
+        if key not in self._prepared:
+            return False
+        self._releasePrepared(key)
+        self.preparedCompleted += 1
+        return True
+
+    def _addPrepared(self, prepared):
+        if not isinstance(self._prepared, OrderedDict):
+            # Wallet persisted before prepared requests were released
+            self._prepared = OrderedDict(self._prepared)
+        now = time.time()
+        for k, v in prepared.items():
+            self._prepared[k] = v
+            self._prepared.move_to_end(k)
+            self._preparedTimes[k] = now
+        self.expirePrepared(now)
+
+    def _releasePrepared(self, key):
+        self._prepared.pop(key, None)
+        self._preparedTimes.pop(key, None)
+
+    def expirePrepared(self, now=None):
+        """
+        Release prepared requests older than `PreparedTimeout` seconds, and
+        the oldest ones beyond `MaxPrepared`
+        """
+        now = now or time.time()
+        for _ in range(self._expiredPreparedCount(now)):
+            self._releasePrepared(next(iter(self._prepared)))
+            self.preparedExpired += 1
+
+    def _expiredPreparedCount(self, now) -> int:
+        # Number of the oldest prepared requests which have expired
+        count = 0
+        for key in self._prepared:
+            preparedAt = self._preparedTimes.get(key, now)
+            if now - preparedAt < self.PreparedTimeout and \
+                    len(self._prepared) - count <= self.MaxPrepared:
+                break
+            count += 1
+        return count
+
+    @property
+    def preparedStats(self):
+        return {
+            'prepared': len(self._prepared),
+            'completed': self.preparedCompleted,
+            'expired': self.preparedExpired
+        }
 
     def _attribReply(self, result, preparedReq):
         _, attrKey = preparedReq
@@ -273,26 +533,26 @@ class Wallet(PWallet, Sponsoring):
                 # the NYM transaction
 
     def _getTxnsReply(self, result, preparedReq):
-        # TODO
-        pass
+        # Remember where the sync of this identifier got to, so that the next
+        # GET_TXNS for it resumes from there. The transactions themselves are
+        # skipped, they can make up a large reply
+        jsonData = result.get(DATA)
+        if jsonData:
+            for key, value in iterObjectItems(jsonData, skipKeys=(TXNS,)):
+                if key == LAST_TXN and value:
+                    self.addLastKnownSeqs(result[IDENTIFIER], value)
 
     def pendRequest(self, req, key=None):
         self._pending.appendleft((req, key))
 
     def getLinkInvitationByTarget(self, target: str) -> Link:
-        for k, li in self._links.items():
-            if li.remoteIdentifier == target:
-                return li
+        return self._getLinkByField('remoteIdentifier', target)
 
     def getLinkInvitation(self, name: str):
         return self._links.get(name)
 
     def getMatchingLinks(self, name: str) -> List[Link]:
-        allMatched = []
-        for k, v in self._links.items():
-            if self._isMatchingName(name, k):
-                allMatched.append(v)
-        return allMatched
+        return [self._links[k] for k in self._linkNameIndex.search(name)]
 
     # TODO: sender by default should be `self.defaultId`
     def requestAttribute(self, attrib: Attribute, sender):
@@ -321,14 +581,10 @@ class Wallet(PWallet, Sponsoring):
     # DEPR
     # Why shouldn't we fetch link by nonce
     def getLinkByNonce(self, nonce) -> Optional[Link]:
-        for _, li in self._links.items():
-            if li.invitationNonce == nonce:
-                return li
+        return self._getLinkByField('invitationNonce', nonce)
 
     def getLinkByInternalId(self, internalId) -> Optional[Link]:
-        for _, li in self._links.items():
-            if li.internalId == internalId:
-                return li
+        return self._getLinkByField('internalId', internalId)
 
     def getIdentity(self, idr):
         # TODO, Question: Should it consider self owned identities too or
@@ -9,32 +9,90 @@ from sovrin_common.txn import getTxnOrderedFields
 
 
 class ClientReqRepStoreFile(PClientReqRepStoreFile):
+    # Number of stale records the last txn log may hold before being compacted
+    lastTxnsCompactionThreshold = 1000
+
     def __init__(self, name, baseDir):
         super().__init__(name, baseDir)
         self.lastTxnsFileName = "last_txn_for_id"
+        # Last txn for each identifier, loaded from the log on first use
+        self._lastTxns = None
+        # Number of records in the log file
+        self._lastTxnsRecords = 0
+        # Whether the file needs a rewrite before records can be appended
+        self._lastTxnsUnterminated = False
 
     @property
     def txnFieldOrdering(self):
         fields = getTxnOrderedFields()
         return updateFieldsWithSeqNo(fields)
 
-    def setLastTxnForIdentifier(self, identifier, value: str):
-        filePath = os.path.join(self.dataLocation, self.lastTxnsFileName)
-        if not os.path.exists(filePath):
-            open(filePath, 'w').close()
-        with open(filePath, "r+") as f:
-            data = f.read().strip()
-            data = json.loads(data) if data else {}
-            data[identifier] = value
-            f.seek(0)
-            f.write(json.dumps(data))
+    @property
+    def lastTxnsFilePath(self):
+        return os.path.join(self.dataLocation, self.lastTxnsFileName)
 
-    def getLastTxnForIdentifier(self, identifier):
+    def _loadLastTxns(self):
+        """
+        The log holds one JSON object per line, later lines overriding
+        earlier ones. A file written before the log was introduced holds a
+        single object, possibly followed by stale bytes, which is read as the
+        first line.
+        """
+        self._lastTxns = {}
+        self._lastTxnsRecords = 0
         try:
-            with open(os.path.join(self.dataLocation, self.lastTxnsFileName),
-                      "r") as f:
-                data = f.read().strip()
-                data = json.loads(data) if data else {}
-                return data.get(identifier)
+            with open(self.lastTxnsFilePath, "r") as f:
+                content = f.read()
         except FileNotFoundError:
-            return None
+            return
+        self._lastTxnsUnterminated = bool(content) and \
+            not content.endswith("\n")
+        decoder = json.JSONDecoder()
+        for line in content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record, _ = decoder.raw_decode(line)
+            except ValueError:
+                # Partially written record
+                continue
+            if isinstance(record, dict):
+                self._lastTxns.update(record)
+                self._lastTxnsRecords += 1
+
+    @property
+    def lastTxns(self):
+        if self._lastTxns is None:
+            self._loadLastTxns()
+        return self._lastTxns
+
+    def setLastTxnForIdentifier(self, identifier, value: str):
+        lastTxns = self.lastTxns
+        if lastTxns.get(identifier) == value:
+            return
+        lastTxns[identifier] = value
+        if self._lastTxnsUnterminated:
+            self.compactLastTxns()
+            return
+        with open(self.lastTxnsFilePath, "a") as f:
+            f.write(json.dumps({identifier: value}) + "\n")
+        self._lastTxnsRecords += 1
+        if self._lastTxnsRecords - len(lastTxns) > \
+                self.lastTxnsCompactionThreshold:
+            self.compactLastTxns()
+
+    def getLastTxnForIdentifier(self, identifier):
+        return self.lastTxns.get(identifier)
+
+    def compactLastTxns(self):
+        """
+        Rewrite the log with a single record per identifier
+        """
+        tmpPath = self.lastTxnsFilePath + ".tmp"
+        with open(tmpPath, "w") as f:
+            for identifier, value in self.lastTxns.items():
+                f.write(json.dumps({identifier: value}) + "\n")
+        os.replace(tmpPath, self.lastTxnsFilePath)
+        self._lastTxnsRecords = len(self.lastTxns)
+        self._lastTxnsUnterminated = False
@@ -23,8 +23,24 @@ LAST_TXN_DATA = "LastTxnData"
 
 
 class ClientReqRepStoreOrientDB(ClientReqRepStore):
-    def __init__(self, store: OrientDbStore):
+    """
+    Statements are written with `?` placeholders and their parameters are
+    rendered as escaped literals in a single place, see `_render`.
+
+    Writes whose result is not needed (acks, nacks, consensus flags, last
+    transactions and new requests) are queued and sent together as one batch
+    script, either once `maxPendingWrites` are queued, on the next read or
+    when `flush` is called. Replies are sent in the same batch as the writes
+    queued before them.
+    """
+
+    DefaultMaxPendingWrites = 100
+
+    def __init__(self, store: OrientDbStore, maxPendingWrites: int = None):
         self.store = store
+        self.maxPendingWrites = maxPendingWrites or \
+            self.DefaultMaxPendingWrites
+        self._pendingWrites = []  # type: List[str]
         self.bootstrap()
 
     @property
@@ -65,130 +81,202 @@ class ClientReqRepStoreOrientDB(ClientReqRepStore):
         })
         self.store.createIndexOnClass(REQ_DATA, "hasConsensus")
 
+    @staticmethod
+    def _literal(value) -> str:
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (int, float)):
+            return str(value)
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"') \
+            .replace("'", "\\'").replace("\n", "\\n").replace("\r", "\\r")
+        return "'{}'".format(value)
+
+    @staticmethod
+    def _mapKey(key: str) -> str:
+        # Map keys are part of a field path and cannot be parameters
+        if not key.isidentifier():
+            raise ValueError("{} cannot be used as a map key".format(key))
+        return key
+
+    @classmethod
+    def _render(cls, statement: str, *params) -> str:
+        """
+        Replace each `?` in the statement with the next parameter as a
+        literal. Parameters are substituted in one pass so a `?` inside a
+        parameter is never treated as a placeholder.
+        """
+        parts = statement.split("?")
+        if len(parts) - 1 != len(params):
+            raise ValueError("{} expects {} parameters, got {}".
+                             format(statement, len(parts) - 1, len(params)))
+        rendered = [parts[0]]
+        for param, part in zip(params, parts[1:]):
+            rendered.append(cls._literal(param))
+            rendered.append(part)
+        return "".join(rendered)
+
+    def _command(self, statement: str, *params):
+        self.flush()
+        return self.store.client.command(self._render(statement, *params))
+
+    def _queueWrite(self, statement: str, *params):
+        self._pendingWrites.append(self._render(statement, *params))
+        if len(self._pendingWrites) >= self.maxPendingWrites:
+            self.flush()
+
+    def _batch(self, statements: List[str], returning: str = None):
+        script = ["begin"]
+        script.extend(statements)
+        if returning:
+            script.append("let result = {}".format(returning))
+        script.append("commit retry 10")
+        if returning:
+            script.append("return $result")
+        return self.store.client.batch(";\n".join(script))
+
+    @property
+    def pendingWrites(self) -> int:
+        return len(self._pendingWrites)
+
+    def flush(self):
+        """
+        Send all queued writes as a single batch
+        """
+        if not self._pendingWrites:
+            return
+        statements = self._pendingWrites
+        self._pendingWrites = []
+        if len(statements) == 1:
+            self.store.client.command(statements[0])
+        else:
+            self._batch(statements)
+
     @property
     def lastReqId(self):
-        result = self.store.client.command("select max({}) as lastId from {}".
-                                           format(f.REQ_ID.nm, REQ_DATA))
+        result = self._command("select max({}) as lastId from {}".
+                               format(f.REQ_ID.nm, REQ_DATA))
         return 0 if not result else result[0].oRecordData['lastId']
 
     def addRequest(self, req: Request):
-        self.store.client.command(
-            "insert into {} set {} = {}, {} = '{}',{} = '{}', "
+        self._queueWrite(
+            "insert into {} set {} = ?, {} = ?, {} = ?, "
             "nacks = {{}}, replies = {{}}".
-            format(REQ_DATA, f.REQ_ID.nm, req.reqId,
-                   f.IDENTIFIER.nm, req.identifier,
-                   TXN_TYPE, req.operation[TXN_TYPE]))
+            format(REQ_DATA, f.REQ_ID.nm, f.IDENTIFIER.nm, TXN_TYPE),
+            req.reqId, req.identifier, req.operation[TXN_TYPE])
 
     def addAck(self, msg: Any, sender: str):
-        identifier = msg[f.IDENTIFIER.nm]
-        reqId = msg[f.REQ_ID.nm]
-        self.store.client.command(
-            "update {} add acks = '{}' where {} = '{}' and {} = {}".
-            format(REQ_DATA, sender, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm,
-                   reqId))
+        self._queueWrite(
+            "update {} add acks = ? where {} = ? and {} = ?".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            sender, msg[f.IDENTIFIER.nm], msg[f.REQ_ID.nm])
 
     def addNack(self, msg: Any, sender: str):
-        identifier = msg[f.IDENTIFIER.nm]
-        reqId = msg[f.REQ_ID.nm]
-        reason = msg[f.REASON.nm]
-        reason = reason.replace('"', '\\"').replace("'", "\\'")
-        self.store.client.command(
-            "update {} set nacks.{} = '{}' where {} = '{}' and {} = {}".
-            format(REQ_DATA, sender, reason, f.IDENTIFIER.nm, identifier,
-                   f.REQ_ID.nm,
-                   reqId))
+        self._queueWrite(
+            "update {} set nacks.{} = ? where {} = ? and {} = ?".
+            format(REQ_DATA, self._mapKey(sender), f.IDENTIFIER.nm,
+                   f.REQ_ID.nm),
+            msg[f.REASON.nm], msg[f.IDENTIFIER.nm], msg[f.REQ_ID.nm])
 
     def addReply(self, identifier: str, reqId: int, sender: str, result: Any) -> \
             Sequence[str]:
-        txnId = result[TXN_ID]
-        txnTime = result.get(TXN_TIME)
         serializedTxn = self.txnSerializer.serialize(result, toBytes=False)
-        serializedTxn = serializedTxn.replace('"', '\\"').replace("'", "\\'")
-        res = self.store.client.command(
-            "update {} set replies.{} = '{}' return "
-            "after @this.replies where {} = '{}' and {} = {}".
-            format(REQ_DATA, sender, serializedTxn, f.IDENTIFIER.nm, identifier,
-                   f.REQ_ID.nm, reqId))
-        replies = res[0].oRecordData['value']
         # TODO: Set txnId txnTime, txnType only when got same f+1 replies
-        if len(replies) == 1:
-            self.store.client.command(
-                "update {} set {} = '{}', {} = {}, {} = '{}' "
-                "where {} = '{}' and {} = {}".
-                format(REQ_DATA, TXN_ID, txnId, TXN_TIME,
-                       txnTime, TXN_TYPE, result[TXN_TYPE],
-                       f.IDENTIFIER.nm, identifier,
-                       f.REQ_ID.nm, reqId))
+        # The transaction fields are only set by the first reply
+        update = self._render(
+            "update {} set replies.{} = ?, "
+            "{} = ifnull({}, ?), {} = ifnull({}, ?), {} = ifnull({}, ?) "
+            "return after @this.replies where {} = ? and {} = ?".
+            format(REQ_DATA, self._mapKey(sender), TXN_ID, TXN_ID,
+                   TXN_TIME, TXN_TIME, TXN_TYPE, TXN_TYPE,
+                   f.IDENTIFIER.nm, f.REQ_ID.nm),
+            serializedTxn, result[TXN_ID], result.get(TXN_TIME),
+            result[TXN_TYPE], identifier, reqId)
+        if self._pendingWrites:
+            statements = self._pendingWrites
+            self._pendingWrites = []
+            res = self._batch(statements, returning=update)
+        else:
+            res = self.store.client.command(update)
+        replies = res[0].oRecordData['value']
         return len(replies)
 
     def requestConfirmed(self, identifier, reqId):
-        result = self.store.client.command(
-            "select {} from {} where {} = '{}' and {} = {}".
-            format(TXN_ID, REQ_DATA, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm,
-                   reqId))
+        result = self._command(
+            "select {} from {} where {} = ? and {} = ?".
+            format(TXN_ID, REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            identifier, reqId)
         return bool(result[0].oRecordData.get(TXN_ID) if result else False)
 
     def hasRequest(self, identifier: str, reqId: int):
-        result = self.store.client.command(
-            "select from {} where {} = '{}' and {} = {}".
-            format(REQ_DATA, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm, reqId))
+        result = self._command(
+            "select from {} where {} = ? and {} = ?".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            identifier, reqId)
         return bool(result)
 
+    def _deserializeReplies(self, replies):
+        return {k: self.txnSerializer.deserialize(v)
+                for k, v in replies.items()}
+
     def getReplies(self, identifier: str, reqId: int):
-        result = self.store.client.command(
-            "select replies from {} where {} = '{}' and {} = {}".
-            format(REQ_DATA, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm, reqId))
+        result = self._command(
+            "select replies from {} where {} = ? and {} = ?".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            identifier, reqId)
         if not result:
             return {}
         else:
-            return {
-                k: self.txnSerializer.deserialize(v)
-                for k, v in result[0].oRecordData['replies'].items()
-                }
+            return self._deserializeReplies(result[0].oRecordData['replies'])
 
     def getAcks(self, identifier: str, reqId: int) -> List[str]:
-        result = self.store.client.command(
-            "select acks from {} where {} = '{}' and {} = {}".
-            format(REQ_DATA, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm, reqId))
+        result = self._command(
+            "select acks from {} where {} = ? and {} = ?".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            identifier, reqId)
         if not result:
             return []
         result = result[0].oRecordData.get('acks', [])
         return result
 
     def getNacks(self, identifier: str, reqId: int) -> dict:
-        result = self.store.client.command(
-            "select nacks from {} where {} = '{}' and {} = {}".
-            format(REQ_DATA, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm, reqId))
+        result = self._command(
+            "select nacks from {} where {} = ? and {} = ?".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            identifier, reqId)
         return {} if not result else result[0].oRecordData.get('nacks', {})
 
-    def setConsensus(self, identifier: str, reqId: int, value='true'):
-        self.store.client.command(
-            "update {} set hasConsensus = {} where {} = '{}' and {} = {}".
-            format(REQ_DATA, value, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm,
-                   reqId))
+    def setConsensus(self, identifier: str, reqId: int, value=True):
+        if isinstance(value, str):
+            value = value == 'true'
+        self._queueWrite(
+            "update {} set hasConsensus = ? where {} = ? and {} = ?".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            value, identifier, reqId)
 
     def hasConsensus(self, identifier: str, reqId: int):
-        result = self.store.client.command("select hasConsensus from {} where "
-                                           "{} = '{}' and {} = {}".format(
-            REQ_DATA, f.IDENTIFIER.nm, identifier, f.REQ_ID.nm,
-            reqId))
-        if result and result[0].oRecordData.get('hasConsensus'):
-            replies = self.getReplies(identifier, reqId).values()
-            fVal = getMaxFailures(len(list(replies)))
-            return checkIfMoreThanFSameItems(replies, fVal)
-        else:
+        result = self._command(
+            "select replies from {} where {} = ? and {} = ? "
+            "and hasConsensus = true".
+            format(REQ_DATA, f.IDENTIFIER.nm, f.REQ_ID.nm),
+            identifier, reqId)
+        if not result:
             return False
+        replies = self._deserializeReplies(
+            result[0].oRecordData.get('replies', {})).values()
+        fVal = getMaxFailures(len(list(replies)))
+        return checkIfMoreThanFSameItems(replies, fVal)
 
     def setLastTxnForIdentifier(self, identifier, value: str):
-        self.store.client.command(
-            "update {} set value = '{}', {} = '{}' upsert "
-            "where {} = '{}'".
-            format(LAST_TXN_DATA, value, f.IDENTIFIER.nm,
-                   identifier, f.IDENTIFIER.nm, identifier))
+        self._queueWrite(
+            "update {} set value = ?, {} = ? upsert where {} = ?".
+            format(LAST_TXN_DATA, f.IDENTIFIER.nm, f.IDENTIFIER.nm),
+            value, identifier, identifier)
 
     def getLastTxnForIdentifier(self, identifier):
-        result = self.store.client.command(
-            "select value from {} where {} = '{}'".
-            format(LAST_TXN_DATA, f.IDENTIFIER.nm,
-                   identifier))
+        result = self._command(
+            "select value from {} where {} = ?".
+            format(LAST_TXN_DATA, f.IDENTIFIER.nm),
+            identifier)
         return None if not result else result[0].oRecordData['value']
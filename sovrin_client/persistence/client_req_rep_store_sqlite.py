@@ -0,0 +1,190 @@
+import os
+import sqlite3
+from typing import Any, Sequence, List, Dict
+
+from plenum.common.txn import TXN_ID, TXN_TYPE, TXN_TIME
+from plenum.common.types import f
+from plenum.common.util import checkIfMoreThanFSameItems, getMaxFailures, \
+    updateFieldsWithSeqNo
+
+from sovrin_common.txn import getTxnOrderedFields
+from sovrin_common.types import Request
+from sovrin_client.persistence.client_req_rep_store import ClientReqRepStore
+
+
+class ClientReqRepStoreSqlite(ClientReqRepStore):
+    """
+    Request/reply store on an embedded SQLite database, so no database
+    server is needed next to the client.
+
+    Requests are keyed by (identifier, reqId) and indexed on hasConsensus.
+    Replies are stored as compact serialized transactions in a BLOB column.
+    """
+
+    dbFileName = "req_rep.db"
+
+    def __init__(self, name, baseDir):
+        self.dataLocation = os.path.join(baseDir, "data/clients", name)
+        if not os.path.exists(self.dataLocation):
+            os.makedirs(self.dataLocation)
+        self.dbPath = os.path.join(self.dataLocation, self.dbFileName)
+        # Autocommit, statements that belong together use a transaction
+        self.conn = sqlite3.connect(self.dbPath, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.bootstrap()
+
+    def bootstrap(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS requests (
+                identifier TEXT NOT NULL,
+                reqId INTEGER NOT NULL,
+                txnType TEXT,
+                txnId TEXT,
+                txnTime INTEGER,
+                hasConsensus INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (identifier, reqId)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS requests_consensus
+                ON requests (hasConsensus);
+            CREATE TABLE IF NOT EXISTS acks (
+                identifier TEXT NOT NULL,
+                reqId INTEGER NOT NULL,
+                sender TEXT NOT NULL,
+                PRIMARY KEY (identifier, reqId, sender)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS nacks (
+                identifier TEXT NOT NULL,
+                reqId INTEGER NOT NULL,
+                sender TEXT NOT NULL,
+                reason TEXT,
+                PRIMARY KEY (identifier, reqId, sender)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS replies (
+                identifier TEXT NOT NULL,
+                reqId INTEGER NOT NULL,
+                sender TEXT NOT NULL,
+                result BLOB NOT NULL,
+                PRIMARY KEY (identifier, reqId, sender)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS last_txns (
+                identifier TEXT PRIMARY KEY,
+                value TEXT
+            ) WITHOUT ROWID;
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def txnFieldOrdering(self):
+        fields = getTxnOrderedFields()
+        return updateFieldsWithSeqNo(fields)
+
+    @property
+    def lastReqId(self):
+        row = self.conn.execute("SELECT max(reqId) FROM requests").fetchone()
+        return row[0] or 0
+
+    def addRequest(self, req: Request):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO requests (identifier, reqId, txnType) "
+            "VALUES (?, ?, ?)",
+            (req.identifier, req.reqId, req.operation[TXN_TYPE]))
+
+    def addAck(self, msg: Any, sender: str):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO acks (identifier, reqId, sender) "
+            "VALUES (?, ?, ?)",
+            (msg[f.IDENTIFIER.nm], msg[f.REQ_ID.nm], sender))
+
+    def addNack(self, msg: Any, sender: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO nacks (identifier, reqId, sender, reason) "
+            "VALUES (?, ?, ?, ?)",
+            (msg[f.IDENTIFIER.nm], msg[f.REQ_ID.nm], sender,
+             msg[f.REASON.nm]))
+
+    def addReply(self, identifier: str, reqId: int, sender: str, result: Any) -> \
+            Sequence[str]:
+        serializedTxn = self.txnSerializer.serialize(result)
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO replies "
+                "(identifier, reqId, sender, result) VALUES (?, ?, ?, ?)",
+                (identifier, reqId, sender, sqlite3.Binary(serializedTxn)))
+            # TODO: Set txnId txnTime, txnType only when got same f+1 replies
+            self.conn.execute(
+                "UPDATE requests SET txnId = coalesce(txnId, ?), "
+                "txnTime = coalesce(txnTime, ?), "
+                "txnType = coalesce(txnType, ?) "
+                "WHERE identifier = ? AND reqId = ?",
+                (result.get(TXN_ID), result.get(TXN_TIME),
+                 result.get(TXN_TYPE), identifier, reqId))
+            row = self.conn.execute(
+                "SELECT count(*) FROM replies "
+                "WHERE identifier = ? AND reqId = ?",
+                (identifier, reqId)).fetchone()
+        return row[0]
+
+    def requestConfirmed(self, identifier, reqId):
+        row = self.conn.execute(
+            "SELECT txnId FROM requests WHERE identifier = ? AND reqId = ?",
+            (identifier, reqId)).fetchone()
+        return bool(row and row[0])
+
+    def hasRequest(self, identifier: str, reqId: int):
+        row = self.conn.execute(
+            "SELECT 1 FROM requests WHERE identifier = ? AND reqId = ?",
+            (identifier, reqId)).fetchone()
+        return row is not None
+
+    def getReplies(self, identifier: str, reqId: int) -> Dict[str, Any]:
+        rows = self.conn.execute(
+            "SELECT sender, result FROM replies "
+            "WHERE identifier = ? AND reqId = ?", (identifier, reqId))
+        return {sender: self.txnSerializer.deserialize(bytes(result))
+                for sender, result in rows}
+
+    def getAcks(self, identifier: str, reqId: int) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT sender FROM acks WHERE identifier = ? AND reqId = ?",
+            (identifier, reqId))
+        return [sender for sender, in rows]
+
+    def getNacks(self, identifier: str, reqId: int) -> dict:
+        rows = self.conn.execute(
+            "SELECT sender, reason FROM nacks "
+            "WHERE identifier = ? AND reqId = ?", (identifier, reqId))
+        return dict(rows)
+
+    def setConsensus(self, identifier: str, reqId: int, value=True):
+        self.conn.execute(
+            "UPDATE requests SET hasConsensus = ? "
+            "WHERE identifier = ? AND reqId = ?",
+            (1 if value else 0, identifier, reqId))
+
+    def hasConsensus(self, identifier: str, reqId: int):
+        rows = self.conn.execute(
+            "SELECT r.result FROM replies r JOIN requests q "
+            "ON q.identifier = r.identifier AND q.reqId = r.reqId "
+            "WHERE q.identifier = ? AND q.reqId = ? AND q.hasConsensus = 1",
+            (identifier, reqId)).fetchall()
+        if not rows:
+            return False
+        replies = [self.txnSerializer.deserialize(bytes(result))
+                   for result, in rows]
+        fVal = getMaxFailures(len(replies))
+        return checkIfMoreThanFSameItems(replies, fVal)
+
+    def setLastTxnForIdentifier(self, identifier, value: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO last_txns (identifier, value) "
+            "VALUES (?, ?)", (identifier, value))
+
+    def getLastTxnForIdentifier(self, identifier):
+        row = self.conn.execute(
+            "SELECT value FROM last_txns WHERE identifier = ?",
+            (identifier,)).fetchone()
+        return None if row is None else row[0]
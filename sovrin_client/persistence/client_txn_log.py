@@ -1,24 +1,68 @@
-from typing import List
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set
 
 from plenum.common.txn import TXN_TYPE
 from plenum.common.util import updateFieldsWithSeqNo
 from plenum.persistence.client_txn_log import ClientTxnLog as PClientTxnLog
 
-from sovrin_common.txn import getTxnOrderedFields
+from sovrin_common.txn import getTxnOrderedFields, NYM, TARGET_NYM
 
 
 class ClientTxnLog(PClientTxnLog):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Keys of transactions in the log by transaction type, in log order,
+        # built on first use and updated on every append
+        self._typeIndex = None  # type: Optional[Dict[str, List[str]]]
+        self._indexedKeys = set()  # type: Set[str]
+        # Target nyms of the NYM transactions in the log
+        self._nyms = set()  # type: Set[str]
 
     @property
     def txnFieldOrdering(self):
         fields = getTxnOrderedFields()
         return updateFieldsWithSeqNo(fields)
 
-    def getTxnsByType(self, txnType: str) -> List:
-        txns = []
-        for val in self.transactionLog.iterator(includeKey=False,
-                                                includeValue=True):
-            txn = self.serializer.deserialize(val, fields=self.txnFieldOrdering)
-            if txn.get(TXN_TYPE) == txnType:
-                txns.append(txn)
-        return txns
+    def _deserialize(self, val):
+        return self.serializer.deserialize(val, fields=self.txnFieldOrdering)
+
+    def _buildIndexes(self):
+        self._typeIndex = defaultdict(list)
+        self._indexedKeys = set()
+        self._nyms = set()
+        for key, val in self.transactionLog.iterator(includeKey=True,
+                                                     includeValue=True):
+            self._index(key, self._deserialize(val))
+
+    @staticmethod
+    def _key(identifier: str, reqId) -> str:
+        return '{}{}'.format(identifier, reqId)
+
+    def _index(self, key: str, txn):
+        if key not in self._indexedKeys:
+            self._indexedKeys.add(key)
+            self._typeIndex[txn.get(TXN_TYPE)].append(key)
+        if txn.get(TXN_TYPE) == NYM and txn.get(TARGET_NYM):
+            self._nyms.add(txn[TARGET_NYM])
+
+    def append(self, identifier: str, reqId, txn):
+        super().append(identifier, reqId, txn)
+        if self._typeIndex is not None:
+            self._index(self._key(identifier, reqId), txn)
+
+    def hasNym(self, nym) -> bool:
+        if self._typeIndex is None:
+            self._buildIndexes()
+        return nym in self._nyms
+
+    def getTxnsByType(self, txnType: str) -> Iterator:
+        """
+        Yield the transactions of the given type in log order. Only the
+        matching entries are read from the log, by their keys.
+        """
+        if self._typeIndex is None:
+            self._buildIndexes()
+        for key in list(self._typeIndex.get(txnType, ())):
+            val = self.transactionLog.get(key)
+            if val is not None:
+                yield self._deserialize(val)
@@ -0,0 +1,56 @@
+import base64
+import json
+from collections import OrderedDict
+from typing import Any, Optional
+
+from ledger.stores.directory_store import DirectoryStore
+
+
+class PublicDataCache:
+    """
+    Cache for immutable public ledger data like schemas and issuer keys.
+
+    Values are held in an in-memory LRU of at most `maxSize` entries in front
+    of an optional directory store, so they survive restarts. Values must be
+    JSON serializable.
+    """
+
+    DefaultMaxSize = 1000
+
+    def __init__(self, baseDir: str = None, name: str = "public_data_cache",
+                 maxSize: int = None):
+        self.maxSize = self.DefaultMaxSize if maxSize is None else maxSize
+        self._lru = OrderedDict()
+        self.store = DirectoryStore(baseDir, name) if baseDir else None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _storeKey(key: str):
+        return base64.urlsafe_b64encode(key.encode()).decode()
+
+    def get(self, key: str) -> Optional[Any]:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return self._lru[key]
+        if self.store:
+            serialized = self.store.get(self._storeKey(key))
+            if serialized:
+                value = json.loads(serialized)
+                self._putInMemory(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any):
+        self._putInMemory(key, value)
+        if self.store:
+            self.store.put(self._storeKey(key), json.dumps(value))
+
+    def _putInMemory(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxSize:
+            self._lru.popitem(last=False)
@@ -97,9 +97,9 @@ class AcmeAgent(TestWalletedAgent):
 
     def _addAtrribute(self, schemaKey, proverId, link):
         attr = self._attrsJobCert[self.getInternalIdByInvitedNonce(proverId)]
-        self.issuer._attrRepo.addAttributes(schemaKey=schemaKey,
-                                            userId=proverId,
-                                            attributes=attr)
+        self.issuer.attrRepo.addAttributes(schemaKey=schemaKey,
+                                           userId=proverId,
+                                           attributes=attr)
 
     def getInternalIdByInvitedNonce(self, nonce):
         if nonce in self._invites:
@@ -0,0 +1,57 @@
+"""
+Measures how many message signatures an agent verifies per second, one at a
+time as messages arrive and in batches split across worker threads as with
+`AgentBatchVerifySignatures`. Run with
+`python -m sovrin_client.test.agent.bench_verify_signatures`.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from base58 import b58decode
+from plenum.common.signer_did import DidSigner
+from plenum.common.signing import serializeMsg
+
+from sovrin_client.agent.verifier_cache import VerifierCache, verifyAll
+
+
+def signedChecks(count: int, senders: int = 10):
+    cache = VerifierCache()
+    signers = [DidSigner() for _ in range(senders)]
+    checks = []
+    for i in range(count):
+        signer = signers[i % senders]
+        msg = {'identifier': signer.identifier, 'reqId': i, 'type': 'bench'}
+        sig = b58decode(signer.sign(msg).encode())
+        verifier = cache.getVerifier(signer.identifier, signer.verkey)
+        checks.append((verifier, sig, serializeMsg(msg)))
+    return checks
+
+
+def report(name: str, count: int, elapsed: float):
+    print("{}: {} signatures in {:.3f}s, {:.0f} per second".
+          format(name, count, elapsed, count / elapsed))
+
+
+def bench(count: int, threads: int = 4):
+    checks = signedChecks(count)
+
+    start = time.perf_counter()
+    results = [verifier.verify(sig, ser) for verifier, sig, ser in checks]
+    report("serial", count, time.perf_counter() - start)
+    assert all(results)
+
+    chunkSize = max(1, -(-count // threads))
+    chunks = [checks[i:i + chunkSize] for i in range(0, count, chunkSize)]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        results = [r for chunkResults in executor.map(verifyAll, chunks)
+                   for r in chunkResults]
+        report("batched on {} threads".format(threads), count,
+               time.perf_counter() - start)
+    assert all(results)
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+          int(sys.argv[2]) if len(sys.argv) > 2 else 4)
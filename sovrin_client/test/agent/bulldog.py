@@ -138,9 +138,9 @@ class BulldogAgent(TestWalletedAgent):
 
     def _addAtrribute(self, schemaKey, proverId, link):
         attr = self._attrs[self.getInternalIdByInvitedNonce(proverId)]
-        self.issuer._attrRepo.addAttributes(schemaKey=schemaKey,
-                                            userId=proverId,
-                                            attributes=attr)
+        self.issuer.attrRepo.addAttributes(schemaKey=schemaKey,
+                                           userId=proverId,
+                                           attributes=attr)
 
     async def addSchemasToWallet(self):
         schema = await self.issuer.genSchema(self._schemaKey.name,
@@ -105,9 +105,9 @@ class FaberAgent(TestWalletedAgent):
 
     def _addAtrribute(self, schemaKey, proverId, link):
         attr = self._attrs[self.getInternalIdByInvitedNonce(proverId)]
-        self.issuer._attrRepo.addAttributes(schemaKey=schemaKey,
-                                            userId=proverId,
-                                            attributes=attr)
+        self.issuer.attrRepo.addAttributes(schemaKey=schemaKey,
+                                           userId=proverId,
+                                           attributes=attr)
 
     async def addSchemasToWallet(self):
         schema = await self.issuer.genSchema(self._schema.name,
@@ -0,0 +1,78 @@
+import pytest
+from plenum.common.port_dispenser import genHa
+from plenum.common.stacked import SimpleStack
+from plenum.common.txn import TYPE
+
+from sovrin_client.agent.constants import BATCH, BATCH_MSGS
+from sovrin_client.agent.endpoint import Endpoint
+
+
+@pytest.fixture
+def received():
+    return []
+
+
+@pytest.fixture
+def endpoint(tdir, received):
+    endpoint = Endpoint(port=genHa()[1], msgHandler=received.append,
+                        name='batcher', basedirpath=tdir,
+                        batchWindow=10, maxBatchSize=3)
+    endpoint.start()
+    yield endpoint
+    endpoint.stop()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """
+    Messages the endpoint passes to the stack, with the uid of the remote
+    """
+    sent = []
+    monkeypatch.setattr(SimpleStack, 'transmit',
+                        lambda self, msg, uid, *args, **kwargs:
+                        sent.append((msg, uid)))
+    return sent
+
+
+def testBatchUnpackedWithSender(endpoint, received):
+    msgs = [{'n': 0}, {'n': 1}]
+    endpoint.baseMsgHandler(({TYPE: BATCH, BATCH_MSGS: msgs}, 'Faber'))
+    endpoint.baseMsgHandler(({'n': 2}, 'Acme'))
+    assert received == [({'n': 0}, 'Faber'), ({'n': 1}, 'Faber'),
+                        ({'n': 2}, 'Acme')]
+
+
+def testMessagesBatchedPerRemote(endpoint, sent, received):
+    endpoint.transmit({'n': 0}, 1)
+    endpoint.transmit({'n': 1}, 1)
+    endpoint.transmit({'n': 2}, 2)
+    # Nothing is sent before the batch window is over
+    endpoint.flushBatches()
+    assert sent == []
+
+    endpoint.flushBatches(force=True)
+    # A single message is sent as it is
+    assert sorted(sent, key=lambda s: s[1]) == [
+        ({TYPE: BATCH, BATCH_MSGS: [{'n': 0}, {'n': 1}]}, 1),
+        ({'n': 2}, 2)]
+
+    for msg, uid in sent:
+        endpoint.baseMsgHandler((msg, uid))
+    assert sorted(received, key=lambda r: r[0]['n']) == [
+        ({'n': 0}, 1), ({'n': 1}, 1), ({'n': 2}, 2)]
+
+
+def testMaxBatchSizeFlushes(endpoint, sent):
+    msgs = [{'n': i} for i in range(4)]
+    for msg in msgs:
+        endpoint.transmit(msg, 1)
+    assert sent == [({TYPE: BATCH, BATCH_MSGS: msgs[:3]}, 1)]
+    assert endpoint._outBatches[('uid', 1)][1] == msgs[3:]
+
+
+def testStopFlushesQueuedMessages(endpoint, sent):
+    endpoint.transmit({'n': 0}, 1)
+    endpoint.transmit({'n': 1}, 1)
+    endpoint.stop()
+    assert sent == [({TYPE: BATCH, BATCH_MSGS: [{'n': 0}, {'n': 1}]}, 1)]
+    assert not endpoint._outBatches
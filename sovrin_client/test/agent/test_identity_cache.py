@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+
+from plenum.common.txn import DATA, ROLE, VERKEY, TARGET_NYM
+
+from sovrin_client.agent.caching import Caching, CachedIdentity
+from sovrin_client.client.wallet.wallet import Wallet
+from sovrin_client.test.helper import OfflineClient
+
+
+def identityReplies(verkeys):
+    def replyFor(req):
+        nym = req.operation[TARGET_NYM]
+        if nym not in verkeys:
+            return {DATA: None}
+        data = {TARGET_NYM: nym, VERKEY: verkeys[nym], ROLE: None}
+        return {DATA: json.dumps(data)}
+    return replyFor
+
+
+def newLoop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+class CachingAgent(Caching):
+    def __init__(self, loop, verkeys):
+        super().__init__()
+        self.loop = loop
+        self.client = OfflineClient(identityReplies(verkeys))
+        self.wallet = Wallet('caching')
+        self.wallet.addIdentifier()
+
+    @property
+    def requested(self):
+        return [req.operation[TARGET_NYM] for req in self.client.sent]
+
+
+def testIdentitiesRefreshedInBulk():
+    loop = newLoop()
+    agent = CachingAgent(loop, {'a': '~keyA', 'b': '~keyB'})
+    entries = loop.run_until_complete(agent.refreshIdentities('a', 'b'))
+    assert [e.verkey for e in entries] == ['~keyA', '~keyB']
+    assert agent.getCachedIdentity('a').verkey == '~keyA'
+    assert sorted(agent.requested) == ['a', 'b']
+    loop.close()
+
+
+def testStaleIdentityServedAndRefreshed():
+    loop = newLoop()
+    agent = CachingAgent(loop, {'a': '~rotatedKey'})
+    agent.identityTtl = 10
+    agent.identityMaxAge = 100
+    agent._identityCache['a'] = CachedIdentity('~oldKey', None,
+                                               time.time() - 50)
+    # Stale entries are still used while being refreshed in the background
+    assert agent.getCachedIdentity('a').verkey == '~oldKey'
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert agent.getCachedIdentity('a').verkey == '~rotatedKey'
+
+    # Expired entries are not used at all
+    agent._identityCache['a'] = CachedIdentity('~oldKey', None,
+                                               time.time() - 500)
+    assert agent.getCachedIdentity('a') is None
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert agent.getCachedIdentity('a').verkey == '~rotatedKey'
+    loop.close()
+
+
+def testLookupsRefreshIdentityOnce():
+    loop = newLoop()
+    agent = CachingAgent(loop, {'a': '~keyA'})
+    # Lookups before the scheduled refresh runs do not schedule another one
+    for _ in range(5):
+        assert agent.getCachedIdentity('a') is None
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert agent.requested == ['a']
+    assert agent.getCachedIdentity('a').verkey == '~keyA'
+    loop.close()
+
+
+def testUnknownIdentityCached():
+    loop = newLoop()
+    agent = CachingAgent(loop, {})
+    agent.getCachedIdentity('unknown')
+    loop.run_until_complete(asyncio.sleep(0.01))
+    entry = agent.getCachedIdentity('unknown')
+    assert entry is not None and entry.verkey is None
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert agent.requested == ['unknown']
+    loop.close()
+
+
+def testStaleIdentitiesRefreshedPeriodically():
+    loop = newLoop()
+    agent = CachingAgent(loop, {'a': '~rotatedKey'})
+    agent.identityTtl = 10
+    agent.identityMaxAge = 100
+    agent._identityCache['a'] = CachedIdentity('~oldKey', None,
+                                               time.time() - 50)
+    agent._identityCache['b'] = CachedIdentity('~oldKey', None,
+                                               time.time() - 500)
+    agent.refreshStaleIdentitiesIfDue()
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert agent._identityCache['a'].verkey == '~rotatedKey'
+    # Identities too old to be used are evicted rather than refreshed
+    assert 'b' not in agent._identityCache
+    agent.refreshStaleIdentitiesIfDue()
+    assert agent.requested == ['a']
+    loop.close()
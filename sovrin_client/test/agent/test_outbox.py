@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+from plenum.common.eventually import eventually
+from plenum.common.port_dispenser import genHa
+
+from sovrin_client.agent.agent import Agent
+
+
+@pytest.fixture
+def agent(tdir, emptyLooper):
+    agent = Agent('outbox', tdir, port=genHa()[1], loop=emptyLooper.loop)
+    emptyLooper.add(agent)
+    return agent
+
+
+@pytest.fixture
+def remote(agent, monkeypatch):
+    """
+    A remote of the agent which is not connected until `connected` is set.
+    `sent` has the messages transmitted to it.
+    """
+    remote = SimpleNamespace(name='Faber', uid=1, ha=('127.0.0.1', 1),
+                             connected=False, sent=[])
+    endpoint = agent.endpoint
+    monkeypatch.setattr(endpoint, 'getRemote',
+                        lambda name=None, ha=None: remote)
+    monkeypatch.setattr(endpoint, 'isConnectedTo',
+                        lambda name=None, ha=None: remote.connected)
+    monkeypatch.setattr(endpoint, 'transmit',
+                        lambda msg, uid: remote.sent.append(msg))
+    return remote
+
+
+def sendAll(agent, remote, msgs):
+    for msg in msgs:
+        agent.sendMessage(msg, name=remote.name)
+
+
+def testQueuedMessagesSentInOrderOnConnect(agent, remote, emptyLooper):
+    msgs = [{'n': i} for i in range(3)]
+    sendAll(agent, remote, msgs)
+    emptyLooper.runFor(.1)
+    assert remote.sent == []
+
+    remote.connected = True
+
+    def chk():
+        assert remote.sent == msgs
+
+    emptyLooper.run(eventually(chk, retryWait=.1, timeout=2))
+    assert remote.name not in agent._outboxes
+
+    # Once connected messages are sent right away
+    agent.sendMessage({'n': 3}, name=remote.name)
+    assert remote.sent == msgs + [{'n': 3}]
+
+
+def testMessagesOverMaxQueuedDropped(agent, remote, emptyLooper):
+    agent.maxQueuedPerRemote = 2
+    msgs = [{'n': i} for i in range(3)]
+    sendAll(agent, remote, msgs)
+    assert len(agent._outboxes[remote.name]) == 2
+
+    remote.connected = True
+
+    def chk():
+        assert remote.sent == msgs[:2]
+
+    emptyLooper.run(eventually(chk, retryWait=.1, timeout=2))
+
+
+def testQueuedMessagesDroppedOnConnectTimeout(agent, remote, emptyLooper):
+    agent.connectTimeout = .2
+    sendAll(agent, remote, [{'n': 0}, {'n': 1}])
+
+    def chk():
+        assert remote.name not in agent._outboxes
+        assert not agent.endpoint._connWaiters
+
+    emptyLooper.run(eventually(chk, retryWait=.1, timeout=2))
+
+    # The dropped messages are not sent once the remote connects
+    remote.connected = True
+    agent.sendMessage({'n': 2}, name=remote.name)
+    emptyLooper.runFor(.1)
+    assert remote.sent == [{'n': 2}]
@@ -0,0 +1,64 @@
+from plenum.common.txn import TYPE
+from plenum.common.types import f
+
+from sovrin_client.agent.constants import PONG, EVENT
+from sovrin_client.agent.msg_constants import REF_REQUEST_ID
+from sovrin_client.agent.rcvd_msg_store import RcvdMsgStore
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def msg(typ):
+    return {TYPE: typ}, ('remote', ('127.0.0.1', 9701))
+
+
+def testLookupByReqIdAndType():
+    store = RcvdMsgStore()
+    store.add(1, msg(EVENT))
+    store.add(1, msg(PONG))
+    assert len(store.get(1)) == 2
+    assert store.getByType(1, PONG) == [msg(PONG)]
+    assert store.getByType(1, 'unknown') == []
+    assert store.getByType(2, PONG) == []
+    assert store.stats['hits'] == 2
+    assert store.stats['misses'] == 2
+
+
+def testLookupByReferredReqId():
+    store = RcvdMsgStore(maxSize=1)
+    pong = {TYPE: PONG, f.REQ_ID.nm: 7, REF_REQUEST_ID: 3}, ('remote', None)
+    store.add(7, pong)
+    assert store.getByType(3, PONG) == [pong]
+    assert store.getByType(7, PONG) == [pong]
+    store.add(8, msg(PONG))
+    assert store.getByType(3, PONG) == []
+
+
+def testEvictsByAge():
+    clock = FakeTime()
+    store = RcvdMsgStore(maxAge=10, getTime=clock)
+    store.add(1, msg(PONG))
+    clock.now = 5
+    store.add(2, msg(PONG))
+    clock.now = 11
+    store.evict()
+    assert 1 not in store
+    assert store.getByType(1, PONG) == []
+    assert store.getByType(2, PONG)
+    assert store.evictions == 1
+
+
+def testEvictsByCount():
+    store = RcvdMsgStore(maxSize=3)
+    for reqId in range(5):
+        store.add(reqId, msg(PONG))
+    assert len(store) == 3
+    assert 0 not in store and 1 not in store
+    assert store.getByType(4, PONG)
+    assert store.evictions == 2
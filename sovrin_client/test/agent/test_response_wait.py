@@ -0,0 +1,61 @@
+import time
+
+import pytest
+from plenum.common.eventually import eventually
+from plenum.common.txn import TYPE
+from plenum.common.types import f
+
+from sovrin_client.agent.agent import WalletedAgent
+from sovrin_client.agent.constants import PONG
+from sovrin_client.agent.msg_constants import REF_REQUEST_ID
+from sovrin_client.client.wallet.wallet import Wallet
+
+
+@pytest.fixture
+def agent(tdir, emptyLooper):
+    return WalletedAgent('waiter', basedirpath=tdir, wallet=Wallet('waiter'),
+                         loop=emptyLooper.loop)
+
+
+def executeOnPong(agent, reqId, maxCheckForMillis=1000):
+    called = []
+    agent.executeWhenResponseRcvd(time.time(), maxCheckForMillis, reqId,
+                                  PONG, False,
+                                  lambda *args: called.append(args), 'done')
+    return called
+
+
+def testResponseReceivedBeforeWaiting(agent, emptyLooper):
+    # The PONG refers to the request it answers
+    pong = {TYPE: PONG, f.REQ_ID.nm: 7, REF_REQUEST_ID: 3}, ('remote', None)
+    agent.rcvdMsgStore.add(7, pong)
+    called = executeOnPong(agent, 3)
+
+    def chk():
+        assert called == [('done',)]
+
+    emptyLooper.run(eventually(chk, retryWait=.1, timeout=2))
+    assert not agent._respWaiters
+
+
+def testResponseReceivedAfterWaiting(agent, emptyLooper):
+    called = executeOnPong(agent, 3)
+    emptyLooper.runFor(.1)
+    assert called == []
+    agent._resolveRespWaiters(({TYPE: PONG, f.REQ_ID.nm: 3}, ('remote', None)))
+
+    def chk():
+        assert called == [('done',)]
+
+    emptyLooper.run(eventually(chk, retryWait=.1, timeout=2))
+
+
+def testNoResponseReceived(agent, emptyLooper):
+    called = executeOnPong(agent, 3, maxCheckForMillis=100)
+
+    def chk():
+        assert len(called) == 1
+        assert called[0][0] is None
+
+    emptyLooper.run(eventually(chk, retryWait=.1, timeout=2))
+    assert not agent._respWaiters
@@ -0,0 +1,171 @@
+import pytest
+from base58 import b58decode
+from plenum.common.signer_did import DidSigner
+from plenum.common.signing import serializeMsg
+from plenum.common.txn import TYPE, DATA, NONCE
+from plenum.common.types import f
+
+from sovrin_client.agent.agent import WalletedAgent
+from sovrin_client.agent.constants import CLAIMS_LIST_FIELD
+from sovrin_client.agent.exception import SignatureRejected
+from sovrin_client.agent.msg_constants import NEW_AVAILABLE_CLAIMS, \
+    AVAIL_CLAIM_LIST
+from sovrin_client.agent.verifier_cache import VerifierCache, verifyAll
+from sovrin_client.client.wallet.link import Link
+from sovrin_client.client.wallet.wallet import Wallet
+
+
+@pytest.fixture
+def agent(tdir):
+    return WalletedAgent('verifier', basedirpath=tdir,
+                         wallet=Wallet('verifier'))
+
+
+def addLinkTo(agent, signer, nonce='nonce'):
+    link = Link('Faber', remoteIdentifier=signer.identifier,
+                invitationNonce=nonce)
+    link.targetVerkey = signer.verkey
+    agent.wallet.addLink(link)
+    return link
+
+
+def signedMsg(signer, typ, data, reqId=1, nonce='nonce'):
+    msg = {TYPE: typ, f.IDENTIFIER.nm: signer.identifier,
+           f.REQ_ID.nm: reqId, NONCE: nonce, DATA: data}
+    msg[f.SIG.nm] = signer.sign(msg)
+    return msg
+
+
+@pytest.fixture
+def batchAgent(agent, monkeypatch):
+    """
+    Agent verifying signatures in batches, which records the request ids of
+    the messages it processes and rejects instead of handling them
+    """
+    agent.batchVerify = True
+    agent.verifyThreads = 2
+    agent.processed = []
+    agent.rejected = []
+    monkeypatch.setattr(agent, '_processVerifiedMsg',
+                        lambda msg, *args:
+                        agent.processed.append(msg[0][f.REQ_ID.nm]))
+    monkeypatch.setattr(agent, 'sendSigVerifResponseMsg',
+                        lambda respMsg, to, typ, idr:
+                        agent.rejected.append(to))
+    yield agent
+    agent.verifyExecutor.shutdown()
+
+
+def receive(agent, msgs, frm='Faber'):
+    for msg in msgs:
+        agent.handleEndpointMessage((msg, frm))
+
+
+def verifyPending(agent):
+    return agent.loop.run_until_complete(agent.verifyPendingMsgs())
+
+
+def testVerifiersAreReused():
+    cache = VerifierCache(maxVerifiers=2)
+    signers = [DidSigner() for _ in range(3)]
+    verifier = cache.getVerifier(signers[0].identifier, signers[0].verkey)
+    assert cache.getVerifier(signers[0].identifier,
+                             signers[0].verkey) is verifier
+    for signer in signers[1:]:
+        cache.getVerifier(signer.identifier, signer.verkey)
+    # The least recently used verifier was dropped
+    assert cache.getVerifier(signers[0].identifier,
+                             signers[0].verkey) is not verifier
+    assert cache.stats['verifierHits'] == 1
+    assert cache.stats['verifierMisses'] == 4
+
+
+def testVerifiedSignaturesAreBounded():
+    cache = VerifierCache(maxVerified=2)
+    cache.addVerified('idr', 1, 'sig1', b'msg1')
+    cache.addVerified('idr', 2, 'sig2', b'msg2')
+    assert cache.isVerified('idr', 1, 'sig1', b'msg1')
+    assert not cache.isVerified('idr', 1, 'sig2', b'msg1')
+    cache.addVerified('idr', 3, 'sig3', b'msg3')
+    assert not cache.isVerified('idr', 2, 'sig2', b'msg2')
+    assert cache.isVerified('idr', 1, 'sig1', b'msg1')
+    assert cache.isVerified('idr', 3, 'sig3', b'msg3')
+
+
+def testVerifiedSignaturesAreForTheirMessage():
+    cache = VerifierCache()
+    cache.addVerified('idr', 1, 'sig1', b'msg1')
+    assert not cache.isVerified('idr', 1, 'sig1', b'tampered')
+
+
+def testTamperedMsgReusingVerifiedSignatureRejected(agent):
+    signer = DidSigner()
+    addLinkTo(agent, signer)
+    msg = signedMsg(signer, NEW_AVAILABLE_CLAIMS, {CLAIMS_LIST_FIELD: []})
+    assert agent.verifySignature(msg)
+    assert agent.isDuplicateMsg(msg)
+
+    tampered = dict(msg)
+    tampered[DATA] = {CLAIMS_LIST_FIELD: [['Forged', '1.0',
+                                           signer.identifier]]}
+    assert not agent.isDuplicateMsg(tampered)
+    with pytest.raises(SignatureRejected):
+        agent.verifySignature(tampered)
+
+
+def testVerifyAll():
+    cache = VerifierCache()
+    signer = DidSigner()
+    verifier = cache.getVerifier(signer.identifier, signer.verkey)
+    checks = []
+    for i in range(3):
+        msg = {'reqId': i}
+        sig = b58decode(signer.sign(msg).encode())
+        checks.append((verifier, sig, serializeMsg(msg)))
+    # Signature of another message
+    checks.append((verifier, checks[0][1], serializeMsg({'reqId': 3})))
+    assert verifyAll(checks) == [True, True, True, False]
+
+
+def testBatchRejectsBadSignature(batchAgent):
+    signer = DidSigner()
+    addLinkTo(batchAgent, signer)
+    good = signedMsg(signer, AVAIL_CLAIM_LIST, {CLAIMS_LIST_FIELD: []})
+    bad = signedMsg(signer, AVAIL_CLAIM_LIST, {CLAIMS_LIST_FIELD: []},
+                    reqId=2)
+    bad[f.SIG.nm] = good[f.SIG.nm]
+    receive(batchAgent, [good, bad])
+    # Nothing is processed before the batch is verified
+    assert batchAgent.processed == []
+    assert verifyPending(batchAgent) == 2
+    assert batchAgent.processed == [1]
+    assert batchAgent.rejected == ['Faber']
+    assert not batchAgent._pendingVerification
+
+
+def testBatchDropsDuplicateOfSameCycle(batchAgent):
+    signer = DidSigner()
+    addLinkTo(batchAgent, signer)
+    msg = signedMsg(signer, AVAIL_CLAIM_LIST, {CLAIMS_LIST_FIELD: []})
+    receive(batchAgent, [msg, dict(msg)])
+    verifyPending(batchAgent)
+    assert batchAgent.processed == [1]
+    assert batchAgent.verifierCache.duplicates == 1
+
+    # Later copies are dropped before being queued for verification
+    receive(batchAgent, [dict(msg)])
+    assert not batchAgent._pendingVerification
+    assert batchAgent.verifierCache.duplicates == 2
+
+
+def testBatchProcessesInArrivalOrder(batchAgent):
+    signer = DidSigner()
+    addLinkTo(batchAgent, signer)
+    msgs = [signedMsg(signer, AVAIL_CLAIM_LIST, {CLAIMS_LIST_FIELD: []},
+                      reqId=reqId)
+            for reqId in range(1, 8)]
+    msgs[3][f.SIG.nm] = msgs[1][f.SIG.nm]
+    receive(batchAgent, msgs)
+    verifyPending(batchAgent)
+    # Verified on two threads, yet processed in the order received
+    assert batchAgent.processed == [1, 2, 3, 5, 6, 7]
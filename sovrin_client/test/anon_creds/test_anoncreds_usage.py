@@ -1,7 +1,10 @@
 import pytest
 
 from anoncreds.protocol.repo.attributes_repo import AttributeRepoInMemory
-from anoncreds.protocol.types import ID, ProofInput, PredicateGE
+from anoncreds.protocol.types import ID, ProofInput, PredicateGE, Claims
+from sovrin_client.agent import claim_issuance
+from sovrin_client.agent.claim_issuance import issuerSnapshot, \
+    initClaimWorker, issueClaimInWorker
 from sovrin_client.anon_creds.sovrin_issuer import SovrinIssuer
 from sovrin_client.anon_creds.sovrin_prover import SovrinProver
 from sovrin_client.anon_creds.sovrin_verifier import SovrinVerifier
@@ -28,6 +31,15 @@ def verifier(userClientB, userWalletB):
     return SovrinVerifier(userClientB, userWalletB)
 
 
+@pytest.fixture
+def claimWorker(monkeypatch):
+    """
+    Lets the test act as a claim issuance worker process, the issuer it
+    sets up for the worker is reset afterwards
+    """
+    monkeypatch.setattr(claim_issuance, '_workerIssuer', None)
+
+
 def testAnonCredsPrimaryOnly(issuer, prover, verifier, attrRepo, primes1, looper):
     async def doTestAnonCredsPrimaryOnly():
         # 1. Create a Schema
@@ -61,3 +73,33 @@ def testAnonCredsPrimaryOnly(issuer, prover, verifier, attrRepo, primes1, looper
         assert await verifier.verify(proofInput, proof, revealedAttrs, nonce)
 
     looper.run(doTestAnonCredsPrimaryOnly)
+
+
+def testAnonCredsClaimIssuedInWorker(issuer, prover, verifier, primes1,
+                                    looper, claimWorker):
+    async def requestClaim():
+        schema = await issuer.genSchema('GVT', '2.0', GVT.attribNames())
+        schemaId = ID(schemaKey=schema.getKey(), schemaId=schema.seqId)
+        await issuer.genKeys(schemaId, **primes1)
+        await issuer.issueAccumulator(schemaId=schemaId, iA='110', L=5)
+
+        attrs = GVT.attribs(name='Alex', age=28, height=175, sex='male')
+        proverId = str(prover.proverId)
+        claimsReq = await prover.createClaimRequest(schemaId, proverId, False)
+        return schemaId, claimsReq, attrs
+
+    schemaId, claimsReq, attrs = looper.run(requestClaim)
+
+    # Issued outside the event loop, the way a claim issuance worker process
+    # issues it
+    initClaimWorker(issuerSnapshot(issuer))
+    claims = issueClaimInWorker(schemaId, claimsReq.toStrDict(), attrs)
+
+    async def proveClaim():
+        await prover.processClaim(schemaId, Claims.fromStrDict(claims))
+        proofInput = ProofInput(['name'], [PredicateGE('age', 18)])
+        nonce = verifier.generateNonce()
+        proof, revealedAttrs = await prover.presentProof(proofInput, nonce)
+        assert await verifier.verify(proofInput, proof, revealedAttrs, nonce)
+
+    looper.run(proveClaim)
@@ -6,9 +6,11 @@ from anoncreds.protocol.repo.attributes_repo import AttributeRepoInMemory
 from anoncreds.protocol.types import Schema, ID
 from anoncreds.protocol.wallet.issuer_wallet import IssuerWalletInMemory
 from plenum.common.log import getlogger
+from plenum.common.txn import TARGET_NYM, TXN_TYPE, DATA, NAME, VERSION
 
 from sovrin_client.anon_creds.sovrin_public_repo import SovrinPublicRepo
 from sovrin_client.test.anon_creds.conftest import GVT
+from sovrin_common.txn import GET_SCHEMA
 
 
 logger = getlogger()
@@ -96,6 +98,25 @@ def testGetSchema(submittedSchemaDefGvt, publicRepo, looper):
     assert schema == submittedSchemaDefGvt
 
 
+def testGetSchemaReleasesPreparedRequest(submittedSchemaDefGvt, publicRepo,
+                                         stewardWallet, looper):
+    schemaKey = submittedSchemaDefGvt.getKey()
+    op = {
+        TARGET_NYM: schemaKey.issuerId,
+        TXN_TYPE: GET_SCHEMA,
+        DATA: {
+            NAME: schemaKey.name,
+            VERSION: schemaKey.version,
+        }
+    }
+    prepared = set(stewardWallet._prepared)
+    completed = stewardWallet.preparedCompleted
+    data, seqNo = looper.run(publicRepo._sendGetReq(op))
+    assert data
+    assert set(stewardWallet._prepared) <= prepared
+    assert stewardWallet.preparedCompleted == completed + 1
+
+
 def testSubmitPublicKey(submittedPublicKeys):
     assert submittedPublicKeys
 
@@ -0,0 +1,13 @@
+import pytest
+
+from sovrin_node.test.helper import genTestClient
+
+
+@pytest.fixture
+def unconnectedClient(nodeSet, tdir):
+    """
+    A client of the pool which is not connected to it, replies are passed
+    to it directly
+    """
+    client, _ = genTestClient(nodeSet, tmpdir=tdir, usePoolLedger=True)
+    return client
@@ -0,0 +1,34 @@
+from plenum.common.txn import REPLY, REQNACK
+from plenum.common.types import OP_FIELD_NAME, f
+
+from sovrin_common.txn import TXN_TYPE, TARGET_NYM, GET_NYM, DATA
+from sovrin_common.types import Request
+
+
+def getNym(reqId, identifier='idr1', nym='nym1'):
+    return Request(identifier=identifier, reqId=reqId,
+                   operation={TXN_TYPE: GET_NYM, TARGET_NYM: nym})
+
+
+def nymReply(req):
+    return {TXN_TYPE: GET_NYM, f.IDENTIFIER.nm: req.identifier,
+            f.REQ_ID.nm: req.reqId, TARGET_NYM: req.operation[TARGET_NYM],
+            DATA: '{"role": null}'}
+
+
+def sendReplies(client, result, nodeCount=None):
+    """
+    Pass the client a reply from each of `nodeCount` nodes of its pool,
+    from all of them by default
+    """
+    for node in list(client.nodeReg)[:nodeCount]:
+        client.handleOneNodeMsg(({OP_FIELD_NAME: REPLY,
+                                  f.RESULT.nm: result}, node))
+
+
+def sendNacks(client, identifier, reqId, reason, nodeCount=None):
+    for node in list(client.nodeReg)[:nodeCount]:
+        client.handleOneNodeMsg(({OP_FIELD_NAME: REQNACK,
+                                  f.IDENTIFIER.nm: identifier,
+                                  f.REQ_ID.nm: reqId,
+                                  f.REASON.nm: reason}, node))
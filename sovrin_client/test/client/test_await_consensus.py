@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from sovrin_client.test.client.helper import sendReplies, sendNacks, \
+    getNym, nymReply
+
+
+def awaitWith(looper, client, req, deliver, timeout=None):
+    """
+    Wait for consensus on `req` while `deliver` passes the client its
+    replies or nacks, after the wait has started
+    """
+    async def go():
+        asyncio.get_event_loop().call_soon(deliver)
+        return await client.awaitConsensus(*req.key, timeout=timeout)
+    return looper.run(go())
+
+
+def testAwaitConsensusOnReply(looper, unconnectedClient):
+    client = unconnectedClient
+    req = getNym(1)
+    client.submitReqs(req)
+    reply, err = awaitWith(looper, client, req,
+                           lambda: sendReplies(client, nymReply(req)))
+    assert reply == nymReply(req)
+    assert err is None
+    assert not client._consensusWaiters
+
+
+def testAwaitConsensusOnNack(looper, unconnectedClient):
+    client = unconnectedClient
+    req = getNym(1)
+    client.submitReqs(req)
+    reply, err = awaitWith(looper, client, req,
+                           lambda: sendNacks(client, *req.key, 'unknown nym'))
+    assert reply is None
+    assert err == 'unknown nym'
+    assert not client._consensusWaiters
+
+
+def testAwaitConsensusTimesOut(looper, unconnectedClient):
+    client = unconnectedClient
+    req = getNym(1)
+    client.submitReqs(req)
+    # A reply from a single node is not consensus
+    with pytest.raises(asyncio.TimeoutError):
+        awaitWith(looper, client, req,
+                  lambda: sendReplies(client, nymReply(req), nodeCount=1),
+                  timeout=0.1)
+    assert not client._consensusWaiters
@@ -0,0 +1,62 @@
+from plenum.common.types import f
+
+from sovrin_client.test.client.helper import sendReplies, getNym, nymReply
+from sovrin_common.txn import DATA
+
+
+def observedReqIds(client):
+    reqIds = []
+    client.registerObserver(
+        lambda name, reqId, frm, result, numReplies: reqIds.append(reqId))
+    return reqIds
+
+
+def testIdenticalReadsMerged(unconnectedClient):
+    client = unconnectedClient
+    reqIds = observedReqIds(client)
+    first, second = getNym(1), getNym(2)
+    other = getNym(3, identifier='idr2')
+    sent = client.submitReqsDeduplicated(first, second, other)
+    # Reads of other senders are not merged
+    assert [req.key for req in sent] == [first.key, other.key]
+
+    sendReplies(client, nymReply(first))
+    assert sorted(reqIds) == [1, 2]
+
+    # Once the read completed an identical one is sent again
+    later = getNym(4)
+    assert [req.key for req in client.submitReqsDeduplicated(later)] == \
+        [later.key]
+
+
+def testReplyIfConsensusOnMergedRead(unconnectedClient):
+    client = unconnectedClient
+    first, merged = getNym(1), getNym(2)
+    client.submitReqsDeduplicated(first, merged)
+    assert client.replyIfConsensus(*merged.key) == (None, None)
+
+    sendReplies(client, nymReply(first))
+    reply, err = client.replyIfConsensus(*merged.key)
+    assert err is None
+    assert (reply[f.IDENTIFIER.nm], reply[f.REQ_ID.nm]) == merged.key
+    assert reply[DATA] == nymReply(first)[DATA]
+
+
+def testReadsMergedIntoTimedOutReadStillComplete(unconnectedClient,
+                                                 monkeypatch):
+    client = unconnectedClient
+    reqIds = observedReqIds(client)
+    monkeypatch.setattr(client.config, 'ClientDedupReadTimeout', 60,
+                        raising=False)
+    first, merged = getNym(1), getNym(2)
+    client.submitReqsDeduplicated(first, merged)
+    # The first read times out, so later reads are sent on their own
+    monkeypatch.setattr(client.config, 'ClientDedupReadTimeout', 0)
+    later = getNym(3)
+    assert [req.key for req in client.submitReqsDeduplicated(later)] == \
+        [later.key]
+
+    sendReplies(client, nymReply(first))
+    assert sorted(reqIds) == [1, 2]
+    reply, _ = client.replyIfConsensus(*merged.key)
+    assert reply[f.REQ_ID.nm] == merged.reqId
@@ -0,0 +1,71 @@
+from plenum.common.txn import STEWARD
+from plenum.common.types import f
+
+from sovrin_common.txn import TXN_TYPE, TARGET_NYM, NYM, ATTRIB, GET_NYM, \
+    ROLE, SPONSOR
+
+
+class RecordingGraph:
+    """
+    Graph store recording what is looked up and added, `stewards` are the
+    nyms it has as stewards
+    """
+    def __init__(self, stewards=()):
+        self.stewards = set(stewards)
+        self.calls = []
+
+    def hasSteward(self, nym):
+        self.calls.append(('hasSteward', nym))
+        return nym in self.stewards
+
+    def addNym(self, txnId, nym, role=None):
+        self.calls.append(('addNym', nym, role))
+        if role == STEWARD:
+            self.stewards.add(nym)
+
+    def addNymTxnToGraph(self, txn):
+        self.calls.append((NYM, txn[TARGET_NYM]))
+
+    def addAttribTxnToGraph(self, txn):
+        self.calls.append((ATTRIB, txn[TARGET_NYM]))
+
+
+def sponsorNym(sponsor, nym):
+    return {TXN_TYPE: NYM, f.IDENTIFIER.nm: sponsor, TARGET_NYM: nym,
+            ROLE: SPONSOR}
+
+
+def testStewardsResolvedOncePerBatch(unconnectedClient):
+    client = unconnectedClient
+    graph = client.graphStore = RecordingGraph(stewards=['s1'])
+    client.addTxnsToGraph([sponsorNym('s1', 'n1'),
+                           sponsorNym('s1', 'n2'),
+                           sponsorNym('s2', 'n3'),
+                           {TXN_TYPE: ATTRIB, TARGET_NYM: 'n1'},
+                           {TXN_TYPE: GET_NYM, TARGET_NYM: 'n1'}])
+    lookups = [call for call in graph.calls if call[0] == 'hasSteward']
+    assert sorted(lookups) == [('hasSteward', 's1'), ('hasSteward', 's2')]
+    # Only the missing steward is added
+    assert [call for call in graph.calls if call[0] == 'addNym'] == \
+        [('addNym', 's2', STEWARD)]
+    # Transactions are added in order, after their stewards
+    assert graph.calls[len(lookups) + 1:] == \
+        [(NYM, 'n1'), (NYM, 'n2'), (NYM, 'n3'), (ATTRIB, 'n1')]
+
+    # Known stewards are not looked up again
+    graph.calls.clear()
+    client.addTxnsToGraph([sponsorNym('s1', 'n4'), sponsorNym('s2', 'n5')])
+    assert graph.calls == [(NYM, 'n4'), (NYM, 'n5')]
+
+
+def testKnownStewardsAreBounded(unconnectedClient):
+    client = unconnectedClient
+    client.MaxKnownStewards = 2
+    graph = client.graphStore = RecordingGraph(stewards=['s1', 's2', 's3'])
+    for steward in ('s1', 's2', 's1', 's3'):
+        client.addTxnsToGraph([sponsorNym(steward, 'n')])
+    assert list(client._knownStewards) == ['s1', 's3']
+
+    graph.calls.clear()
+    client.addTxnsToGraph([sponsorNym('s2', 'n')])
+    assert graph.calls == [('hasSteward', 's2'), (NYM, 'n')]
@@ -0,0 +1,82 @@
+from plenum.common.types import f
+
+from sovrin_client.client.wallet.wallet import Wallet
+from sovrin_common.txn import TXN_TYPE, NYM, ATTRIB
+
+
+def reply(txnType, identifier, reqId=1):
+    return {TXN_TYPE: txnType, f.IDENTIFIER.nm: identifier,
+            f.REQ_ID.nm: reqId}
+
+
+def testObserversNotifiedByTxnTypeAndIdentifier(unconnectedClient):
+    client = unconnectedClient
+    notified = []
+
+    def observer(name, reqId, frm, result, numReplies):
+        notified.append(name)
+
+    client.registerObserver(observer, name='all')
+    client.registerObserver(lambda *args: observer(*args), name='nyms',
+                            txnTypes=[NYM])
+    client.registerObserver(lambda *args: observer(*args), name='idr1',
+                            identifiers=['idr1'])
+    client.registerObserver(lambda *args: observer(*args), name='idr2Nyms',
+                            txnTypes=[NYM], identifiers=['idr2'])
+
+    def notifiedFor(txnType, identifier):
+        del notified[:]
+        client._notifyObservers(1, 'Alpha', reply(txnType, identifier), 2)
+        return sorted(notified)
+
+    assert notifiedFor(NYM, 'idr1') == ['all', 'idr1', 'nyms']
+    assert notifiedFor(ATTRIB, 'idr1') == ['all', 'idr1']
+    assert notifiedFor(NYM, 'idr2') == ['all', 'idr2Nyms', 'nyms']
+    assert notifiedFor(ATTRIB, 'idr3') == ['all']
+
+    client.setObserverIdentifiers('idr1', ['idr3'])
+    assert notifiedFor(ATTRIB, 'idr1') == ['all']
+    assert notifiedFor(ATTRIB, 'idr3') == ['all', 'idr1']
+
+    client.deregisterObserver('all')
+    assert notifiedFor(ATTRIB, 'idr2') == []
+
+
+def testObserverTimings(unconnectedClient):
+    client = unconnectedClient
+
+    def failing(*args):
+        raise RuntimeError('observer failed')
+
+    client.registerObserver(lambda *args: None, name='quiet')
+    client.registerObserver(failing, name='failing')
+    for reqId in range(3):
+        client._notifyObservers(reqId, 'Alpha', reply(NYM, 'idr1', reqId), 2)
+    for name in ('quiet', 'failing'):
+        calls, total, longest = client.observerTimings[name]
+        assert calls == 3
+        assert 0 <= longest <= total
+
+    client.deregisterObserver('quiet')
+    assert 'quiet' not in client.observerTimings
+
+
+def testWalletObservedForItsIdentifiers(unconnectedClient):
+    client = unconnectedClient
+    wallet = Wallet('observed')
+    idr, _ = wallet.addIdentifier()
+    client.observeWallet(wallet)
+
+    def observersFor(identifier):
+        return [observer for _, observer in client._observersFor(NYM,
+                                                                 identifier)]
+
+    assert observersFor(idr) == [wallet.handleIncomingReply]
+    assert observersFor('other') == []
+    newIdr, _ = wallet.addIdentifier()
+    assert observersFor(newIdr) == [wallet.handleIncomingReply]
+
+    client.unobserveWallet(wallet)
+    assert observersFor(idr) == []
+    # The wallet no longer refers to the client
+    assert not wallet._identifierListeners
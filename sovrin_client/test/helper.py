@@ -75,6 +75,39 @@ class TestClient(Client, StackedTester, TestClientStorage):
         super().onStopping(*args, **kwargs)
 
 
+class OfflineClient:
+    """
+    Stands in for a client in tests which need no pool. Requests are
+    recorded in `sent`, and `awaitConsensus` answers them with the reply
+    `replyFor` returns for them.
+    """
+    config = None
+
+    def __init__(self, replyFor=None):
+        self.sent = []
+        self.observers = {}
+        self.replyFor = replyFor
+
+    def hasObserver(self, observer):
+        return observer in self.observers.values()
+
+    def registerObserver(self, observer, name=None, **kwargs):
+        self.observers[name] = observer
+
+    def deregisterObserver(self, name):
+        del self.observers[name]
+
+    def submitReqs(self, *reqs):
+        self.sent.extend(reqs)
+        return list(reqs)
+
+    submitReqsDeduplicated = submitReqs
+
+    async def awaitConsensus(self, identifier, reqId, timeout=None):
+        req = next(r for r in self.sent if r.key == (identifier, reqId))
+        return self.replyFor(req), None
+
+
 def createNym(looper, nym, creatorClient, creatorWallet: Wallet, role=None,
               verkey=None):
     idy = Identity(identifier=nym,
@@ -0,0 +1,42 @@
+import json
+import os
+
+from sovrin_client.persistence.client_req_rep_store_file import \
+    ClientReqRepStoreFile
+
+
+def testLastTxnsSurviveReopen(tdir):
+    store = ClientReqRepStoreFile('client1', tdir)
+    store.setLastTxnForIdentifier('idr1', '10')
+    store.setLastTxnForIdentifier('idr2', '3')
+    store.setLastTxnForIdentifier('idr1', '7')
+
+    reopened = ClientReqRepStoreFile('client1', tdir)
+    assert reopened.getLastTxnForIdentifier('idr1') == '7'
+    assert reopened.getLastTxnForIdentifier('idr2') == '3'
+    assert reopened.getLastTxnForIdentifier('idr3') is None
+
+
+def testLastTxnsLogIsCompacted(tdir):
+    store = ClientReqRepStoreFile('client2', tdir)
+    store.lastTxnsCompactionThreshold = 5
+    for i in range(20):
+        store.setLastTxnForIdentifier('idr', str(i))
+    with open(store.lastTxnsFilePath) as f:
+        assert len(f.readlines()) <= 6
+    reopened = ClientReqRepStoreFile('client2', tdir)
+    assert reopened.getLastTxnForIdentifier('idr') == '19'
+
+
+def testReadsOldFormatWithStaleBytes(tdir):
+    store = ClientReqRepStoreFile('client3', tdir)
+    # A shorter object written over a longer one without truncating
+    with open(store.lastTxnsFilePath, 'w') as f:
+        f.write(json.dumps({'idr1': '5', 'idr2': '8'}) + '2", "idr3": "1"}')
+    assert store.getLastTxnForIdentifier('idr1') == '5'
+    assert store.getLastTxnForIdentifier('idr3') is None
+    store.setLastTxnForIdentifier('idr1', '6')
+    reopened = ClientReqRepStoreFile('client3', tdir)
+    assert reopened.getLastTxnForIdentifier('idr1') == '6'
+    assert reopened.getLastTxnForIdentifier('idr2') == '8'
+    assert os.path.exists(reopened.lastTxnsFilePath)
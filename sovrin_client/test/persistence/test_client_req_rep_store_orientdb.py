@@ -0,0 +1,62 @@
+import pytest
+from plenum.common.types import f
+
+from sovrin_client.persistence.client_req_rep_store_orientdb import \
+    ClientReqRepStoreOrientDB
+
+
+class RecordingClient:
+    def __init__(self):
+        self.commands = []
+        self.batches = []
+
+    def command(self, statement):
+        self.commands.append(statement)
+        return []
+
+    def batch(self, script):
+        self.batches.append(script)
+        return []
+
+
+class RecordingStore:
+    def __init__(self):
+        self.client = RecordingClient()
+
+    def createClasses(self, classesNeeded):
+        pass
+
+
+@pytest.fixture
+def reqRepStore():
+    return ClientReqRepStoreOrientDB(RecordingStore(), maxPendingWrites=3)
+
+
+def testParametersAreRenderedAsLiterals():
+    statement = ClientReqRepStoreOrientDB._render(
+        "select from X where a = ? and b = ? and c = ?",
+        "it's ?", 7, None)
+    assert statement == "select from X where a = 'it\\'s ?' and b = 7 " \
+                        "and c = null"
+    with pytest.raises(ValueError):
+        ClientReqRepStoreOrientDB._render("a = ?")
+
+
+def testWritesAreBatchedUntilRead(reqRepStore):
+    msg = {f.IDENTIFIER.nm: 'idr', f.REQ_ID.nm: 1, f.REASON.nm: "can't"}
+    reqRepStore.addAck(msg, 'Alpha')
+    reqRepStore.addNack(msg, 'Beta')
+    assert reqRepStore.pendingWrites == 2
+    assert not reqRepStore.store.client.commands
+
+    reqRepStore.getAcks('idr', 1)
+    assert reqRepStore.pendingWrites == 0
+    assert len(reqRepStore.store.client.batches) == 1
+    assert len(reqRepStore.store.client.commands) == 1
+
+
+def testWritesAreFlushedWhenLimitReached(reqRepStore):
+    for i in range(3):
+        reqRepStore.setLastTxnForIdentifier('idr{}'.format(i), str(i))
+    assert reqRepStore.pendingWrites == 0
+    assert len(reqRepStore.store.client.batches) == 1
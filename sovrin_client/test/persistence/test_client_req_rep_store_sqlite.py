@@ -0,0 +1,56 @@
+import pytest
+from plenum.common.txn import TXN_ID, TXN_TYPE
+from plenum.common.types import f
+
+from sovrin_common.txn import NYM, TARGET_NYM
+from sovrin_common.types import Request
+from sovrin_client.persistence.client_req_rep_store_sqlite import \
+    ClientReqRepStoreSqlite
+
+
+@pytest.fixture
+def reqRepStore(tdir):
+    store = ClientReqRepStoreSqlite('client1', tdir)
+    yield store
+    store.close()
+
+
+def nymReply(txnId):
+    return {TXN_TYPE: NYM, TXN_ID: txnId, TARGET_NYM: 'target',
+            f.IDENTIFIER.nm: 'idr', f.REQ_ID.nm: 1}
+
+
+def testRequestLifecycle(reqRepStore):
+    req = Request(identifier='idr', reqId=1,
+                  operation={TXN_TYPE: NYM, TARGET_NYM: 'target'})
+    reqRepStore.addRequest(req)
+    assert reqRepStore.hasRequest('idr', 1)
+    assert not reqRepStore.hasRequest('idr', 2)
+    assert reqRepStore.lastReqId == 1
+
+    ack = {f.IDENTIFIER.nm: 'idr', f.REQ_ID.nm: 1}
+    reqRepStore.addAck(ack, 'Alpha')
+    reqRepStore.addAck(ack, 'Alpha')
+    reqRepStore.addNack(dict(ack, **{f.REASON.nm: 'bad'}), 'Beta')
+    assert reqRepStore.getAcks('idr', 1) == ['Alpha']
+    assert reqRepStore.getNacks('idr', 1) == {'Beta': 'bad'}
+
+    assert not reqRepStore.requestConfirmed('idr', 1)
+    for i, sender in enumerate(['Alpha', 'Gamma', 'Delta']):
+        assert reqRepStore.addReply('idr', 1, sender, nymReply('t1')) == i + 1
+    assert reqRepStore.requestConfirmed('idr', 1)
+    assert set(reqRepStore.getReplies('idr', 1)) == {'Alpha', 'Gamma',
+                                                     'Delta'}
+
+    assert not reqRepStore.hasConsensus('idr', 1)
+    reqRepStore.setConsensus('idr', 1)
+    assert reqRepStore.hasConsensus('idr', 1)
+
+
+def testLastTxnsArePersisted(reqRepStore, tdir):
+    reqRepStore.setLastTxnForIdentifier('idr', '4')
+    reqRepStore.setLastTxnForIdentifier('idr', '9')
+    reopened = ClientReqRepStoreSqlite('client1', tdir)
+    assert reopened.getLastTxnForIdentifier('idr') == '9'
+    assert reopened.getLastTxnForIdentifier('other') is None
+    reopened.close()
@@ -0,0 +1,45 @@
+import types
+
+from plenum.common.txn import TXN_TYPE, TXN_ID
+
+from sovrin_common.txn import NYM, ATTRIB, TARGET_NYM
+from sovrin_client.persistence.client_txn_log import ClientTxnLog
+
+
+def txn(typ, i):
+    return {TXN_TYPE: typ, TXN_ID: 'txn{}'.format(i),
+            TARGET_NYM: 'nym{}'.format(i)}
+
+
+def testGetTxnsByType(tdir):
+    txnLog = ClientTxnLog('client1', tdir)
+    for i in range(6):
+        txnLog.append('idr', i, txn(NYM if i % 2 else ATTRIB, i))
+
+    nyms = txnLog.getTxnsByType(NYM)
+    assert isinstance(nyms, types.GeneratorType)
+    assert [t[TXN_ID] for t in nyms] == ['txn1', 'txn3', 'txn5']
+
+    # Appends after the index is built are indexed too
+    txnLog.append('idr', 6, txn(NYM, 6))
+    assert [t[TXN_ID] for t in txnLog.getTxnsByType(NYM)] == \
+        ['txn1', 'txn3', 'txn5', 'txn6']
+    assert list(txnLog.getTxnsByType('unknown')) == []
+
+    # The index is rebuilt from the log when it is reopened
+    reopened = ClientTxnLog('client1', tdir)
+    assert [t[TXN_ID] for t in reopened.getTxnsByType(ATTRIB)] == \
+        ['txn0', 'txn2', 'txn4']
+
+
+def testHasNym(tdir):
+    txnLog = ClientTxnLog('client2', tdir)
+    txnLog.append('idr', 1, txn(NYM, 1))
+    txnLog.append('idr', 2, txn(ATTRIB, 2))
+    assert txnLog.hasNym('nym1')
+    assert not txnLog.hasNym('nym2')
+    assert not txnLog.hasNym('nym3')
+
+    txnLog.append('idr', 3, txn(NYM, 3))
+    assert txnLog.hasNym('nym3')
+    assert ClientTxnLog('client2', tdir).hasNym('nym3')
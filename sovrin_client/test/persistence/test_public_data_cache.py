@@ -0,0 +1,26 @@
+from sovrin_client.persistence.public_data_cache import PublicDataCache
+
+
+def testLruEvictsLeastRecentlyUsed():
+    cache = PublicDataCache(maxSize=2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    assert cache.get('a') == [1]
+    assert cache.get('c') == [3]
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+def testValuesPersistAcrossInstances(tdir):
+    cache = PublicDataCache(tdir, maxSize=1)
+    cache.put('schema:GVT:1.0', [{'name': 'GVT'}, 10])
+    cache.put('issuerKey:GVT', [{'data': {}}, 11])
+    # evicted from memory but still on disk
+    assert cache.get('schema:GVT:1.0') == [{'name': 'GVT'}, 10]
+
+    reopened = PublicDataCache(tdir)
+    assert reopened.get('issuerKey:GVT') == [{'data': {}}, 11]
+    assert reopened.get('unknown') is None
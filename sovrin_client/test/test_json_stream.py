@@ -0,0 +1,18 @@
+import json
+
+from sovrin_client.client.json_stream import iterObjectItems
+
+
+def testStreamsAndSkipsArrays():
+    text = json.dumps({'lastTxn': '5',
+                       'txns': [{'data': ']}"['}, None, [1, 2]],
+                       'other': {'nested': [1, {'x': '}'}]}})
+    assert list(iterObjectItems(text, streamKeys=('txns',))) == [
+        ('lastTxn', '5'),
+        ('txns', {'data': ']}"['}), ('txns', None), ('txns', [1, 2]),
+        ('other', {'nested': [1, {'x': '}'}]})]
+    assert list(iterObjectItems(text, skipKeys=('txns', 'other'))) == \
+        [('lastTxn', '5')]
+    assert list(iterObjectItems('{"txns": [ ], "a": 1}',
+                                streamKeys=('txns',))) == [('a', 1)]
+    assert list(iterObjectItems(' { } ')) == []
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+from plenum.common.txn import TXN_TYPE, DATA
+from plenum.common.types import f
+
+from sovrin_client.client.ledger_sync import LedgerSync
+from sovrin_client.client.wallet.wallet import Wallet
+from sovrin_client.test.helper import OfflineClient
+from sovrin_common.txn import GET_TXNS, LAST_TXN, TXNS
+
+
+def walletWithIdentifiers(count):
+    wallet = Wallet('synced')
+    for _ in range(count):
+        wallet.addIdentifier()
+    return wallet
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def reply(ledgerSync, req, lastTxn=None):
+    result = {TXN_TYPE: GET_TXNS, f.IDENTIFIER.nm: req.identifier}
+    if lastTxn:
+        result[DATA] = json.dumps({LAST_TXN: lastTxn, TXNS: [{}, {}]})
+    ledgerSync.handleReply('sync', req.reqId, 'Alpha', result, 2)
+
+
+def testSyncKeepsLimitedRequestsInFlight(loop):
+    client = OfflineClient()
+    ledgerSync = LedgerSync(client, walletWithIdentifiers(10), maxInFlight=3,
+                            loop=loop)
+    ledgerSync.start()
+    assert len(client.sent) == 3
+
+    replied = 0
+    while client.sent:
+        assert len(ledgerSync._inFlight) <= 3
+        reply(ledgerSync, client.sent.pop(0))
+        replied += 1
+
+    assert replied == 10
+    assert len(ledgerSync.synced) == 10
+    assert ledgerSync.isDone
+    assert not client.observers
+
+
+def testSyncResumesWithoutResyncing(loop):
+    client = OfflineClient()
+    ledgerSync = LedgerSync(client, walletWithIdentifiers(4), maxInFlight=2,
+                            loop=loop)
+    ledgerSync.start()
+    reply(ledgerSync, client.sent.pop(0))
+    client.sent.clear()
+
+    # Unanswered requests time out and are sent again, the synced identifier
+    # is not
+    ledgerSync.reqTimeout = 0
+    ledgerSync.start()
+    assert len(client.sent) == 2
+    while client.sent:
+        reply(ledgerSync, client.sent.pop(0))
+    assert len(ledgerSync.synced) == 4
+    assert ledgerSync.isDone
+
+
+def testPagedSyncRequestsUntilNoNewTxns(loop):
+    client = OfflineClient()
+    wallet = walletWithIdentifiers(1)
+    idr = wallet.defaultId
+    ledgerSync = LedgerSync(client, wallet, paged=True, loop=loop)
+    ledgerSync.start()
+    for lastTxn in ('3', '6', '6'):
+        reply(ledgerSync, client.sent.pop(0), lastTxn)
+    assert not client.sent
+    assert wallet.getLastKnownSeqs(idr) == '6'
+    assert ledgerSync.synced == {idr}
+    assert ledgerSync.isDone
+
+
+def testTimedOutRequestsSentAgain(loop):
+    client = OfflineClient()
+    ledgerSync = LedgerSync(client, walletWithIdentifiers(3), maxInFlight=2,
+                            loop=loop)
+    ledgerSync.start()
+    lost, answered = client.sent
+    client.sent.clear()
+
+    # Requests that timed out are sent again when a reply arrives
+    ledgerSync.reqTimeout = 0
+    reply(ledgerSync, answered)
+    assert lost.identifier in {req.identifier for req in client.sent}
+    assert len(client.sent) == 2
+
+    # and when the expiry timer is due, until the sync is done
+    client.sent.clear()
+    ledgerSync._expiryDue()
+    assert len(client.sent) == 2
+    ledgerSync.reqTimeout = 60
+    while client.sent:
+        reply(ledgerSync, client.sent.pop(0))
+    assert ledgerSync.isDone
+    assert ledgerSync._expiryTimer is None
+
+
+def testSyncMovedToAnotherClient(loop):
+    client = OfflineClient()
+    ledgerSync = LedgerSync(client, walletWithIdentifiers(3), maxInFlight=2,
+                            loop=loop)
+    ledgerSync.start()
+    reply(ledgerSync, client.sent.pop(0))
+
+    other = OfflineClient()
+    ledgerSync.setClient(other)
+    assert not client.observers
+    ledgerSync.start()
+    assert len(other.sent) == 2
+    while other.sent:
+        reply(ledgerSync, other.sent.pop(0))
+    assert len(ledgerSync.synced) == 3
@@ -0,0 +1,47 @@
+"""
+Measures how many pending requests a wallet signs per second, with
+`preparePending` on the event loop and `preparePendingAsync` on a worker
+thread. Run with `python -m sovrin_client.test.wallet.bench_prepare_pending`.
+"""
+import asyncio
+import sys
+import time
+
+from plenum.common.txn import TXN_TYPE, TARGET_NYM
+
+from sovrin_client.client.wallet.wallet import Wallet
+from sovrin_common.txn import NYM
+from sovrin_common.types import Request
+
+
+def pendedWallet(count: int) -> Wallet:
+    wallet = Wallet('bench')
+    idr = wallet.addIdentifier()[0]
+    for i in range(count):
+        op = {TXN_TYPE: NYM, TARGET_NYM: 'nym{}'.format(i)}
+        wallet.pendRequest(Request(identifier=idr, operation=op))
+    return wallet
+
+
+def bench(count: int):
+    wallet = pendedWallet(count)
+    start = time.perf_counter()
+    reqs = wallet.preparePending()
+    elapsed = time.perf_counter() - start
+    assert len(reqs) == count
+    print("preparePending: {} requests in {:.3f}s, {:.0f} per second".
+          format(count, elapsed, count / elapsed))
+
+    wallet = pendedWallet(count)
+    loop = asyncio.new_event_loop()
+    start = time.perf_counter()
+    reqs = loop.run_until_complete(wallet.preparePendingAsync(loop=loop))
+    elapsed = time.perf_counter() - start
+    loop.close()
+    assert len(reqs) == count
+    print("preparePendingAsync: {} requests in {:.3f}s, {:.0f} per second".
+          format(count, elapsed, count / elapsed))
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
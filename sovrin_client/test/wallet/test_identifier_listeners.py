@@ -0,0 +1,34 @@
+import pickle
+
+from sovrin_client.client.wallet.wallet import Wallet
+
+
+def testListenersNotifiedOfAddedIdentifiers():
+    wallet = Wallet('listened')
+    added = []
+    wallet.addIdentifierListener(added.append)
+    idr, _ = wallet.addIdentifier()
+    assert added == [idr]
+
+
+def testListenersNotPersisted():
+    wallet = Wallet('listened')
+    wallet.addIdentifierListener(lambda idr: None)
+    restored = pickle.loads(pickle.dumps(wallet))
+    added = []
+    restored.addIdentifierListener(added.append)
+    idr, _ = restored.addIdentifier()
+    assert added == [idr]
+
+
+def testListenersOfWalletPersistedBeforeListeners():
+    wallet = Wallet('listened')
+    # As restored by jsonpickle from a wallet persisted without a state
+    del wallet.__dict__['_identifierListeners']
+    wallet.addIdentifier()
+    added = []
+    wallet.addIdentifierListener(added.append)
+    idr, _ = wallet.addIdentifier()
+    wallet.removeIdentifierListener(added.append)
+    wallet.addIdentifier()
+    assert added == [idr]
@@ -0,0 +1,71 @@
+import os
+import pickle
+
+import jsonpickle
+
+from sovrin_client.client.wallet.link import Link
+from sovrin_client.client.wallet.wallet import Wallet
+
+
+def addedLinks(wallet, count=5):
+    for i in range(count):
+        wallet.addLink(Link('Link{}'.format(i),
+                            remoteIdentifier='target{}'.format(i),
+                            invitationNonce='nonce{}'.format(i),
+                            internalId=i))
+    return wallet
+
+
+def testLinkLookupsByIndexedFields():
+    wallet = addedLinks(Wallet('indexed'))
+    link = wallet.getLink('Link3')
+    assert wallet.getLinkInvitationByTarget('target3') is link
+    assert wallet.getLinkByNonce('nonce3') is link
+    assert wallet.getLinkByInternalId(3) is link
+    assert wallet.getLinkInvitationByTarget('unknown') is None
+
+
+def testLinkIndexesFollowFieldChanges():
+    wallet = addedLinks(Wallet('indexed'))
+    link = wallet.getLink('Link1')
+    link.remoteIdentifier = 'newTarget'
+    link.invitationNonce = 'newNonce'
+    assert wallet.getLinkInvitationByTarget('target1') is None
+    assert wallet.getLinkInvitationByTarget('newTarget') is link
+    assert wallet.getLinkByNonce('nonce1') is None
+    assert wallet.getLinkByNonce('newNonce') is link
+
+
+def testReplacedLinkIsUnindexed():
+    wallet = addedLinks(Wallet('indexed'))
+    old = wallet.getLink('Link2')
+    new = Link('Link2', remoteIdentifier='otherTarget')
+    wallet.addLink(new)
+    old.remoteIdentifier = 'target2'
+    assert wallet.getLinkInvitationByTarget('target2') is None
+    assert wallet.getLinkInvitationByTarget('otherTarget') is new
+
+
+def testLinkIndexesRebuiltOnRestore():
+    wallet = addedLinks(Wallet('indexed'))
+    restored = pickle.loads(pickle.dumps(wallet))
+    link = restored.getLink('Link4')
+    assert restored.getLinkByNonce('nonce4') is link
+    link.internalId = 'student4'
+    assert restored.getLinkByInternalId('student4') is link
+
+
+def testLinkLookupsOnWalletPersistedBeforeIndexes():
+    # Such wallets have no state of their own, so jsonpickle restores them
+    # without calling `__setstate__`
+    walletFilePath = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.realpath(__file__))), 'cli', 'tmp_wallet_restore_issue')
+    with open(walletFilePath) as walletFile:
+        wallet = jsonpickle.decode(walletFile.read())
+    link = wallet.getLink('Faber College')
+    assert wallet.getLinkByNonce('b1134a647eb818069c089e7694f63e6d') is link
+    assert wallet.getLinkInvitationByTarget(
+        'FuN98eH2eZybECWkofW6A9BKJxxnTatBCopfUiNxo6ZB') is link
+    assert wallet.getMatchingLinks('faber') == [link]
+    wallet.addLink(Link('Link0', invitationNonce='nonce0'))
+    assert wallet.getLinkByNonce('nonce0').name == 'Link0'
@@ -0,0 +1,55 @@
+from sovrin_client.client.wallet.link import Link, ClaimProofRequest
+from sovrin_client.client.wallet.ngram_index import NGramIndex
+from sovrin_client.client.wallet.wallet import Wallet
+
+
+def testNGramIndexMatchesSubstringSemantics():
+    texts = {
+        1: ['Faber College'],
+        2: ['Acme Corp', 'Job-Application'],
+        3: ['Thrift Bank'],
+        4: [],
+    }
+    index = NGramIndex()
+    for key, keyTexts in texts.items():
+        index.set(key, keyTexts)
+
+    for needle in ['', 'a', 'C', 'co', 'CORP', 'ge', 'job-app', 'rift b',
+                   'bank', 'xyz', 'faber college!']:
+        expected = [k for k, keyTexts in texts.items()
+                    if any(needle.lower() in t.lower() for t in keyTexts)]
+        assert index.search(needle) == expected
+
+
+def testNGramIndexUpdates():
+    index = NGramIndex()
+    index.set('a', ['Transcript'])
+    index.set('b', ['Banking Relationship'])
+    assert index.search('script') == ['a']
+    index.set('a', ['Job-Certificate'])
+    assert index.search('script') == []
+    assert index.search('cert') == ['a']
+    index.remove('a')
+    assert index.search('cert') == []
+    assert 'a' not in index
+    assert len(index) == 1
+
+
+def testWalletMatchingUsesSearchIndexes():
+    wallet = Wallet('search')
+    for name in ['Faber College', 'Acme Corp', 'Thrift Bank']:
+        wallet.addLink(Link(name))
+    assert [li.name for li in wallet.getMatchingLinks('c')] == \
+        ['Faber College', 'Acme Corp']
+
+    acme = wallet.getLink('Acme Corp')
+    claim = ('Job-Certificate', '0.2', 'acmeIdr')
+    acme.addAvailableClaims([claim])
+    cpr = ClaimProofRequest('Job-Application', '0.2', {}, [])
+    acme.addClaimProofRequest(cpr)
+
+    assert wallet.getMatchingLinksWithAvailableClaim('cert') == \
+        [(acme, claim)]
+    assert wallet.getMatchingLinksWithAvailableClaim() == [(acme, claim)]
+    assert wallet.getMatchingLinksWithClaimReq('job', 'acme') == [(acme, cpr)]
+    assert wallet.getMatchingLinksWithClaimReq('job', 'faber') == []
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import pickle
+
+from plenum.common.txn import TXN_TYPE, TARGET_NYM, DATA
+from plenum.common.types import f
+
+from sovrin_client.client.wallet.wallet import Wallet
+from sovrin_common.txn import NYM, GET_TXNS, LAST_TXN, TXNS
+from sovrin_common.types import Request
+
+
+def preparedWallet(count=3):
+    wallet = Wallet('prepared')
+    for _ in range(count):
+        wallet.addIdentifier()
+    return wallet, wallet.prepareTxnRequests()
+
+
+def testPreparedRequestReleasedOnReply():
+    wallet, reqs = preparedWallet()
+    req = reqs[0]
+    wallet.handleIncomingReply('obs', req.reqId, 'Alpha',
+                               {f.IDENTIFIER.nm: req.identifier,
+                                TXN_TYPE: 'unhandled'}, 2)
+    assert req.key not in wallet._prepared
+    assert wallet.preparedStats == {'prepared': 2, 'completed': 1,
+                                    'expired': 0}
+
+
+def testGetTxnsReplyRecordsLastTxn():
+    wallet, reqs = preparedWallet()
+    req = reqs[0]
+    data = json.dumps({TXNS: [{TXN_TYPE: NYM}] * 3, LAST_TXN: 7})
+    wallet.handleIncomingReply('obs', req.reqId, 'Alpha',
+                               {f.IDENTIFIER.nm: req.identifier,
+                                TXN_TYPE: GET_TXNS, DATA: data}, 2)
+    assert wallet.getLastKnownSeqs(req.identifier) == 7
+
+
+def testPreparedRequestReleasedOnce():
+    wallet, reqs = preparedWallet()
+    req = reqs[0]
+    assert wallet.releasePrepared(req.key)
+    assert not wallet.releasePrepared(req.key)
+    assert wallet.preparedStats == {'prepared': 2, 'completed': 1,
+                                    'expired': 0}
+
+
+def testPreparedRequestsExpire():
+    wallet, reqs = preparedWallet()
+    wallet.PreparedTimeout = 0
+    pickled = pickle.loads(pickle.dumps(wallet))
+    assert not pickled._prepared
+    assert pickled.preparedStats['expired'] == 3
+    # Persisting the wallet does not change it
+    assert wallet.preparedStats == {'prepared': 3, 'completed': 0,
+                                    'expired': 0}
+
+
+def testPreparedRequestsAreBounded():
+    wallet, _ = preparedWallet()
+    wallet.MaxPrepared = 2
+    wallet.prepareTxnRequests()
+    assert len(wallet._prepared) == 2
+    assert wallet.preparedExpired == 4
+
+
+def testPreparedRequestsOfWalletPersistedBeforeRelease():
+    wallet, reqs = preparedWallet()
+    # As restored by jsonpickle from a wallet persisted before prepared
+    # requests were released
+    for attr in ('_preparedTimes', 'preparedCompleted', 'preparedExpired'):
+        wallet.__dict__.pop(attr)
+    wallet._prepared = dict(wallet._prepared)
+    wallet.releasePrepared(reqs[0].key)
+    newReqs = wallet.prepareTxnRequests()
+    assert list(wallet._prepared) == [req.key for req in reqs[1:] + newReqs]
+    assert wallet.preparedStats == {'prepared': 5, 'completed': 1,
+                                    'expired': 0}
+
+
+def testPreparePendingKeepsSubmissionOrder():
+    wallet = Wallet('batch')
+    idr = wallet.addIdentifier()[0]
+    pended = []
+    for i in range(5):
+        req = Request(identifier=idr,
+                      operation={TXN_TYPE: NYM, TARGET_NYM: 'nym{}'.format(i)})
+        wallet.pendRequest(req, i)
+        pended.append(req)
+    first = wallet.preparePending(limit=2)
+    rest = wallet.preparePending()
+    assert first + rest == pended
+    assert all(req.signature for req in first + rest)
+    assert [wallet._prepared[req.key][1] for req in first + rest] == \
+        list(range(5))
+
+
+def testPreparePendingAsyncOnGivenLoop():
+    wallet = Wallet('async')
+    idr = wallet.addIdentifier()[0]
+    pended = [Request(identifier=idr,
+                      operation={TXN_TYPE: NYM, TARGET_NYM: 'nym{}'.format(i)})
+              for i in range(3)]
+    for req in pended:
+        wallet.pendRequest(req)
+    loop = asyncio.new_event_loop()
+    try:
+        reqs = loop.run_until_complete(wallet.preparePendingAsync(loop=loop))
+    finally:
+        loop.close()
+    assert reqs == pended
+    assert all(req.signature for req in reqs)
+    assert all(req.key in wallet._prepared for req in reqs)
+    # The signing lock is not persisted
+    pickled = pickle.loads(pickle.dumps(wallet))
+    assert pickled._signLock is not wallet._signLock